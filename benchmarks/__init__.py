@@ -0,0 +1 @@
+# Empty
\ No newline at end of file
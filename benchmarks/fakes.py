@@ -0,0 +1,172 @@
+"""In-memory stand-ins for Home Assistant, the recorder and storage.
+
+They allow running the sensor update path without a running Home Assistant
+instance, e.g. for benchmarks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from contextlib import contextmanager
+from datetime import datetime
+import importlib
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.utility_manual_tracking import loader, sensor, statistics
+from custom_components.utility_manual_tracking.consts import DATA_CONFIG, DOMAIN
+
+
+class FakeRecorder:
+    """Recorder keeping the external statistics in memory.
+
+    The statistics are written synchronously, unless queued, in which case
+    they are only written by async_block_till_done, as the recorder's queue.
+    """
+
+    def __init__(self, queued: bool = False) -> None:
+        self.statistics: dict[str, dict[float, float]] = {}
+        self.rows_written = 0
+        self.batches_written = 0
+        self._queued = queued
+        self._queue: list[tuple[dict, list[dict]]] = []
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    def async_add_external_statistics(
+        self, hass: Any, metadata: dict, statistics: list[dict]
+    ) -> None:
+        self._queue.append((metadata, statistics))
+        if not self._queued:
+            self._commit()
+
+    async def async_block_till_done(self) -> None:
+        self._commit()
+
+    def _commit(self) -> None:
+        for metadata, statistics in self._queue:
+            rows = self.statistics.setdefault(metadata["statistic_id"], {})
+            for row in statistics:
+                rows[row["start"].timestamp()] = row["sum"]
+            self.rows_written += len(statistics)
+            self.batches_written += 1
+        self._queue.clear()
+
+    def statistics_during_period(
+        self,
+        hass: Any,
+        start_time: datetime,
+        end_time: datetime,
+        statistic_ids: set[str],
+        period: str,
+        units: dict | None,
+        types: set[str],
+    ) -> dict[str, list[dict]]:
+        result = {}
+        for statistic_id in statistic_ids:
+            rows = self.statistics.get(statistic_id, {})
+            # Statistics are hourly, look the hours of the period up directly
+            starts = range(int(start_time.timestamp()), int(end_time.timestamp()), 3600)
+            result[statistic_id] = [
+                {"start": float(start), "sum": rows[start]}
+                for start in starts
+                if start in rows
+            ]
+        return result
+
+    async def async_add_executor_job(self, target: Callable, *args: Any) -> Any:
+        return target(*args)
+
+
+class FakeStore:
+    """Store keeping the data in memory, in the storage of the fake hass."""
+
+    def __class_getitem__(cls, item: type) -> type[FakeStore]:
+        return cls
+
+    def __init__(self, hass: Any, version: int, key: str, **kwargs: Any) -> None:
+        self.key = key
+        self.loads = 0
+        self.saves = 0
+        self._storage: dict[str, dict] = hass.storage
+        self._delayed_data_func: Callable[[], dict] | None = None
+
+    @property
+    def data(self) -> dict | None:
+        """Return the stored data, writing any delayed save first."""
+        if self._delayed_data_func is not None:
+            self._storage[self.key] = self._delayed_data_func()
+            self._delayed_data_func = None
+            self.saves += 1
+        return self._storage.get(self.key)
+
+    async def async_load(self) -> dict | None:
+        self.loads += 1
+        return self.data
+
+    async def async_save(self, data: dict) -> None:
+        self._delayed_data_func = None
+        self._storage[self.key] = data
+        self.saves += 1
+
+    def async_delay_save(self, data_func: Callable[[], dict], delay: float = 0) -> None:
+        # As the real Store, delayed saves are coalesced into a single write
+        self._delayed_data_func = data_func
+
+
+class FakeHass:
+    """Minimal hass object, as used by the sensor."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.loop = loop
+        self.data: dict[str, Any] = {DOMAIN: {DATA_CONFIG: {}}}
+        # Data of the stores by key, shared by the stores as files on disk
+        self.storage: dict[str, dict] = {}
+
+    def async_create_task(self, target: Coroutine, name: str | None = None) -> Any:
+        return self.loop.create_task(target, name=name)
+
+    async def async_add_executor_job(self, target: Callable, *args: Any) -> Any:
+        return await self.loop.run_in_executor(None, target, *args)
+
+
+@contextmanager
+def fake_home_assistant(recorder: FakeRecorder):
+    """Patch the integration to use the in-memory recorder and storage."""
+    with (
+        patch.object(
+            statistics,
+            "async_add_external_statistics",
+            recorder.async_add_external_statistics,
+        ),
+        patch.object(
+            statistics, "statistics_during_period", recorder.statistics_during_period
+        ),
+        patch.object(statistics, "get_instance", lambda hass: recorder),
+        patch.object(loader, "Store", FakeStore),
+        patch.object(sensor, "async_import_module", _async_import_module),
+    ):
+        yield
+
+
+async def _async_import_module(hass: FakeHass, name: str) -> Any:
+    return importlib.import_module(name)
+
+
+def create_sensor(
+    hass: FakeHass,
+    meter_name: str = "Benchmark",
+    algorithm: str = "linear",
+    **kwargs: Any,
+) -> sensor.UtilityManualTrackingSensor:
+    """Create a sensor bound to the fake hass, without adding it to a platform."""
+    meter = sensor.UtilityManualTrackingSensor(
+        hass, meter_name, "kWh", "energy", algorithm, **kwargs
+    )
+    meter.hass = hass
+    # The sensor is not added to a platform, so there is no state to write
+    meter.async_write_ha_state = lambda: None
+    return meter
@@ -0,0 +1,168 @@
+"""Replay a log of meter readings through the sensor, without Home Assistant.
+
+The readings file has the format of the import_meter_readings service: a CSV
+(columns value, date and optionally entity_id) or a JSON file. Readings of
+each entity_id are replayed into their own meter, in the order of the file,
+through an in-memory recorder and storage. Run from the repository root:
+
+    python -m benchmarks.replay readings.csv --algorithm linear --algorithm regression
+    python -m benchmarks.replay readings.csv --import --output series.csv
+
+A JSON report with the throughput and the peak memory is printed. With
+`--output`, the resulting hourly statistics are written as a CSV file with a
+column per algorithm.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+from datetime import datetime, timezone
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+from custom_components.utility_manual_tracking.action import (
+    _add_readings,
+    _load_readings_file,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.statistics import get_statistics_id
+
+from benchmarks.fakes import FakeHass, FakeRecorder, create_sensor, fake_home_assistant
+
+DEFAULT_METER_NAME = "Replay"
+
+
+def replay(
+    loop: asyncio.AbstractEventLoop,
+    readings: dict[str | None, list[Datapoint]],
+    algorithms: list[str],
+    batch: bool = False,
+) -> tuple[dict[str, dict], FakeRecorder]:
+    """Replay the readings of each meter, returning a report per meter."""
+    hass = FakeHass(loop)
+    recorder = FakeRecorder()
+    report = {}
+    with fake_home_assistant(recorder):
+        for sensor_id, datapoints in readings.items():
+            meter = create_sensor(
+                hass,
+                sensor_id.removeprefix("sensor.") if sensor_id else DEFAULT_METER_NAME,
+                algorithms[0],
+                statistics_algorithms=algorithms[1:],
+            )
+            rows_written = recorder.rows_written
+            started = time.perf_counter()
+            if batch:
+                loop.run_until_complete(meter.async_import_values(datapoints))
+            else:
+                for datapoint in datapoints:
+                    loop.run_until_complete(
+                        meter.async_set_value(datapoint.value, datapoint.timestamp)
+                    )
+            loop.run_until_complete(meter.async_flush())
+            elapsed = time.perf_counter() - started
+
+            rows = recorder.rows_written - rows_written
+            report[meter.unique_id] = {
+                "readings": len(datapoints),
+                "rows_written": rows,
+                "seconds": elapsed,
+                "readings_per_second": len(datapoints) / elapsed if elapsed else None,
+                "rows_per_second": rows / elapsed if elapsed else None,
+                "perf": meter.perf.as_dict(),
+            }
+    return report, recorder
+
+
+def write_series(
+    path: str,
+    recorder: FakeRecorder,
+    sensor_ids: list[str],
+    algorithms: list[str],
+) -> None:
+    """Write the hourly statistics of the meters, with a column per algorithm."""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["meter", "start", *algorithms])
+        for sensor_id in sensor_ids:
+            statistics = [
+                recorder.statistics.get(get_statistics_id(sensor_id, algorithm), {})
+                for algorithm in algorithms
+            ]
+            for start in sorted(set().union(*statistics)):
+                writer.writerow(
+                    [
+                        sensor_id,
+                        datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                        *(rows.get(start) for rows in statistics),
+                    ]
+                )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="CSV or JSON file of readings")
+    parser.add_argument(
+        "--algorithm",
+        action="append",
+        help="Algorithm to replay with, repeat to compare (default: linear)",
+    )
+    parser.add_argument(
+        "--import",
+        dest="batch",
+        action="store_true",
+        help="Replay all the readings of a meter at once, as the import service",
+    )
+    parser.add_argument("--output", help="Write the hourly statistics to this CSV")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also report the peak of traced allocations (slows the replay down)",
+    )
+    args = parser.parse_args()
+    algorithms = args.algorithm or ["linear"]
+
+    readings: dict[str | None, list[Datapoint]] = {}
+    _add_readings(readings, _load_readings_file(args.file))
+
+    if args.trace_memory:
+        tracemalloc.start()
+    loop = asyncio.new_event_loop()
+    try:
+        meters, recorder = replay(loop, readings, algorithms, args.batch)
+    finally:
+        loop.close()
+
+    total_readings = sum(meter["readings"] for meter in meters.values())
+    total_rows = sum(meter["rows_written"] for meter in meters.values())
+    total_seconds = sum(meter["seconds"] for meter in meters.values())
+    report = {
+        "algorithms": algorithms,
+        "readings": total_readings,
+        "rows_written": total_rows,
+        "seconds": total_seconds,
+        "readings_per_second": (
+            total_readings / total_seconds if total_seconds else None
+        ),
+        "rows_per_second": total_rows / total_seconds if total_seconds else None,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "meters": meters,
+    }
+    if args.trace_memory:
+        report["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        write_series(args.output, recorder, list(meters), algorithms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Benchmarks for the fitters, the statistics backfill and the sensor update path.
+
+Run from the repository root:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json
+
+Results are written as JSON. With `--compare`, the run fails when a benchmark
+is slower than the baseline by more than the given threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+import json
+import platform
+import statistics as stats
+import sys
+import time
+
+from custom_components.utility_manual_tracking.algorithms import interpolate_series
+from custom_components.utility_manual_tracking.consts import DEFAULT_RETENTION_READS
+from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.statistics import backfill_statistics
+
+from benchmarks.fakes import FakeHass, FakeRecorder, create_sensor, fake_home_assistant
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+# Readings per burst of the set_value_burst benchmark
+BURST_SIZE = 100
+GAPS = {
+    "1h": timedelta(hours=1),
+    "1month": timedelta(days=30),
+    "1year": timedelta(days=365),
+}
+
+
+def measure(
+    func: Callable[[], object], repeat: int, number: int
+) -> dict[str, float | int]:
+    """Time func, returning per-call timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(timings),
+        "median": stats.median(timings),
+        "mean": stats.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def bench_interpolate(repeat: int) -> dict[str, dict]:
+    results = {}
+    old_datapoints = [Datapoint(0, START)]
+    for name, gap in GAPS.items():
+        new_datapoint = Datapoint(gap / timedelta(hours=1) * 1.5, START + gap)
+        number = max(1, 1000 // max(1, int(gap / timedelta(hours=1))))
+        results[f"interpolate_{name}"] = measure(
+            lambda: interpolate_series("linear", old_datapoints, new_datapoint),
+            repeat,
+            number=number,
+        )
+        results[f"interpolate_pchip_{name}"] = measure(
+            lambda: interpolate_series("pchip", old_datapoints, new_datapoint),
+            repeat,
+            number=number,
+        )
+    return results
+
+
+def bench_backfill(loop: asyncio.AbstractEventLoop, repeat: int) -> dict[str, dict]:
+    hass = FakeHass(loop)
+    recorder = FakeRecorder()
+    series = interpolate_series(
+        "linear", [Datapoint(0, START)], Datapoint(8760, START + GAPS["1year"])
+    )
+    with fake_home_assistant(recorder):
+        result = measure(
+            lambda: loop.run_until_complete(
+                backfill_statistics(
+                    hass, "benchmark", "Benchmark", "kWh", "linear", series
+                )
+            ),
+            repeat,
+            number=1,
+        )
+    result["rows"] = len(series)
+    return {"backfill_statistics_1year": result}
+
+
+def bench_sensor(loop: asyncio.AbstractEventLoop, repeat: int) -> dict[str, dict]:
+    hass = FakeHass(loop)
+    recorder = FakeRecorder()
+    results = {}
+    with fake_home_assistant(recorder):
+        sensor = create_sensor(hass)
+        reading = iter(range(sys.maxsize))
+
+        def set_value() -> None:
+            i = next(reading)
+            loop.run_until_complete(
+                sensor.async_set_value(i * 1.5, START + timedelta(hours=i * 24))
+            )
+
+        for _ in range(DEFAULT_RETENTION_READS):
+            set_value()
+        results["native_value"] = measure(
+            lambda: sensor.evaluate(time.time()), repeat, number=10000
+        )
+        results["state_attributes"] = measure(
+            lambda: sensor.extra_state_attributes, repeat, number=10000
+        )
+        results["set_value"] = measure(set_value, repeat, number=100)
+        results["set_value"]["rows_written"] = recorder.rows_written
+        # The delayed save is only written once flushed, as at shutdown
+        loop.run_until_complete(sensor.async_flush())
+        results["set_value"]["store_saves"] = sensor._store.saves
+
+        # Bursts of concurrent readings, committed in batches by the meter
+        burst_sensor = create_sensor(hass, "Burst")
+        burst = iter(range(0, sys.maxsize, BURST_SIZE))
+
+        async def set_values(start: int) -> None:
+            await asyncio.gather(
+                *(
+                    burst_sensor.async_set_value(
+                        i * 1.5, START + timedelta(hours=i * 24)
+                    )
+                    for i in range(start, start + BURST_SIZE)
+                )
+            )
+
+        results["set_value_burst"] = measure(
+            lambda: loop.run_until_complete(set_values(next(burst))),
+            repeat,
+            number=10,
+        )
+        results["set_value_burst"]["readings"] = BURST_SIZE
+
+        # Restoring a meter from its store, as at startup
+        restored = create_sensor(hass)
+        restored._store = sensor._store
+        results["load"] = measure(
+            lambda: loop.run_until_complete(restored._load_attributes()),
+            repeat,
+            number=100,
+        )
+
+        # The statistics are already up to date, so a reset writes no rows
+        rows_written = recorder.rows_written
+        results["reset_statistics"] = measure(
+            lambda: loop.run_until_complete(sensor.async_reset_statistics()),
+            repeat,
+            number=1,
+        )
+        results["reset_statistics"]["rows_written"] = (
+            recorder.rows_written - rows_written
+        )
+    return results
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    """Return the benchmarks slower than the baseline by more than threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        if ratio > threshold:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    try:
+        benchmarks = {
+            **bench_interpolate(args.repeat),
+            **bench_backfill(loop, args.repeat),
+            **bench_sensor(loop, args.repeat),
+        }
+    finally:
+        loop.close()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["benchmarks"]
+        regressions = compare(benchmarks, baseline, args.threshold)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,105 @@
 from __future__ import annotations
 
+import asyncio
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_SCAN_INTERVAL, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, SupportsResponse
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
 
-from custom_components.utility_manual_tracking.action import handle_update_meter_value
+from custom_components.utility_manual_tracking.action import (
+    handle_get_meter_values,
+    handle_import_meter_readings,
+    handle_reset_meter_statistics,
+    handle_update_meter_value,
+)
 from custom_components.utility_manual_tracking.consts import (
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_EXECUTION_MODE,
+    CONF_STATISTICS_CHUNK_SIZE,
+    CONF_TRACE,
+    DATA_CONFIG,
+    DATA_COORDINATOR,
+    DATA_EXECUTOR,
+    DATA_LOADER,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STATISTICS_CHUNK_SIZE,
     DOMAIN,
     PLATFORMS,
 )
+from custom_components.utility_manual_tracking.coordinator import (
+    MeterRefreshCoordinator,
+)
+from custom_components.utility_manual_tracking.executor import (
+    EXECUTION_MODE_LOOP,
+    EXECUTION_MODES,
+    FitterExecutor,
+)
+from custom_components.utility_manual_tracking.export import MeterExportView
+from custom_components.utility_manual_tracking.loader import MeterStoreLoader
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
+                ): cv.time_period,
+                vol.Optional(
+                    CONF_STATISTICS_CHUNK_SIZE, default=DEFAULT_STATISTICS_CHUNK_SIZE
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=False): cv.boolean,
+                vol.Optional(CONF_TRACE, default=False): cv.boolean,
+                vol.Optional(CONF_EXECUTION_MODE, default=EXECUTION_MODE_LOOP): vol.In(
+                    EXECUTION_MODES
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
 
-def setup(hass: HomeAssistant, config: dict):
+async def async_setup(hass: HomeAssistant, config: dict):
     """Setup the Utility Manual Tracking integration."""
+    conf = config.get(DOMAIN, {})
     hass.data.setdefault(DOMAIN, {})
-    hass.services.register(DOMAIN, "update_meter_value", handle_update_meter_value)
+    hass.data[DOMAIN][DATA_CONFIG] = conf
+    coordinator = MeterRefreshCoordinator(
+        hass, conf.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    )
+    hass.data[DOMAIN][DATA_COORDINATOR] = coordinator
+    executor = FitterExecutor(hass, conf.get(CONF_EXECUTION_MODE, EXECUTION_MODE_LOOP))
+    hass.data[DOMAIN][DATA_EXECUTOR] = executor
+    loader = MeterStoreLoader(hass)
+    loader.async_preload(hass.config_entries.async_entries(DOMAIN))
+    hass.data[DOMAIN][DATA_LOADER] = loader
+
+    async def _async_shutdown(event: Event) -> None:
+        # Config entries are not unloaded at shutdown, flush the meters here
+        await asyncio.gather(
+            *(meter.async_flush() for meter in list(coordinator.meters.values()))
+        )
+        executor.shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+    hass.services.async_register(
+        DOMAIN, "update_meter_value", handle_update_meter_value
+    )
+    hass.services.async_register(
+        DOMAIN, "import_meter_readings", handle_import_meter_readings
+    )
+    hass.services.async_register(
+        DOMAIN, "reset_meter_statistics", handle_reset_meter_statistics
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_meter_values",
+        handle_get_meter_values,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.http.register_view(MeterExportView())
     return True
 
 
@@ -25,4 +111,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    sensor = entry.runtime_data
+    await sensor.async_flush()
+    hass.data.get(DOMAIN).pop(sensor.entity_id, None)
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
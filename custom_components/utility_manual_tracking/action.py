@@ -1,21 +1,28 @@
 """Actions for Utility Manual Tracking integration."""
 
 from __future__ import annotations
-from datetime import datetime, timezone
+import asyncio
+import csv
+from datetime import datetime, timedelta, timezone
+import json
 
-from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceCall, ServiceResponse
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import service
 
 from custom_components.utility_manual_tracking.consts import DOMAIN, LOGGER
+from custom_components.utility_manual_tracking.fitter import Datapoint
 from custom_components.utility_manual_tracking.sensor import (
     UtilityManualTrackingSensor,
 )
 
 
 DATE_FORMAT = "%Y-%m-%d %H"
+# Maximum number of dates a get_meter_values call can evaluate the meters at
+MAX_METER_VALUES = 100000
 
 
-def handle_update_meter_value(call: ServiceCall):
+async def handle_update_meter_value(call: ServiceCall):
     entities = service.async_extract_referenced_entity_ids(call.hass, call)
     value = call.data.get("value")
     read_date_str = call.data.get("date")
@@ -24,26 +31,157 @@ def handle_update_meter_value(call: ServiceCall):
         if read_date_str
         else datetime.now(timezone.utc)
     )
-    for sensor_id in entities.referenced:
+
+    async def update_sensor(sensor_id: str) -> None:
         sensor = call.hass.data.get(DOMAIN)[sensor_id]
         if isinstance(sensor, UtilityManualTrackingSensor):
-            sensor.set_value(value, read_date_utc)
+            await sensor.async_set_value(value, read_date_utc)
             LOGGER.info(f"Updated sensor {sensor_id} with value {value}")
         else:
             LOGGER.error(
                 f"Entity {sensor_id} is not a UtilityManualTrackingSensor, unable to update value."
             )
 
+    await asyncio.gather(
+        *(update_sensor(sensor_id) for sensor_id in entities.referenced)
+    )
+
 
-def handle_reset_meter_statistics(call: ServiceCall):
+async def handle_reset_meter_statistics(call: ServiceCall):
     """Handle the reset_meter_statistics service call."""
     entities = service.async_extract_referenced_entity_ids(call.hass, call)
-    for sensor_id in entities.referenced:
+
+    async def reset_sensor(sensor_id: str) -> None:
         sensor = call.hass.data.get(DOMAIN)[sensor_id]
         if isinstance(sensor, UtilityManualTrackingSensor):
-            sensor.reset_statistics()
+            await sensor.async_reset_statistics()
             LOGGER.info(f"Reset statistics for sensor {sensor_id}")
         else:
             LOGGER.error(
                 f"Entity {sensor_id} is not a UtilityManualTrackingSensor, unable to reset statistics."
             )
+
+    await asyncio.gather(
+        *(reset_sensor(sensor_id) for sensor_id in entities.referenced)
+    )
+
+
+async def handle_import_meter_readings(call: ServiceCall):
+    """Handle the import_meter_readings service call."""
+    entities = service.async_extract_referenced_entity_ids(call.hass, call)
+    readings: dict[str | None, list[Datapoint]] = {}
+    _add_readings(readings, call.data.get("readings") or [])
+    file_path = call.data.get("file")
+    if file_path:
+        if not call.hass.config.is_allowed_path(file_path):
+            raise ServiceValidationError(f"Path {file_path} is not allowed")
+        _add_readings(
+            readings,
+            await call.hass.async_add_executor_job(_load_readings_file, file_path),
+        )
+
+    async def import_sensor(sensor_id: str) -> None:
+        sensor = call.hass.data.get(DOMAIN)[sensor_id]
+        if isinstance(sensor, UtilityManualTrackingSensor):
+            sensor_readings = readings.get(None, []) + readings.get(sensor_id, [])
+            await sensor.async_import_values(sensor_readings)
+            LOGGER.info(
+                f"Imported {len(sensor_readings)} readings into sensor {sensor_id}"
+            )
+        else:
+            LOGGER.error(
+                f"Entity {sensor_id} is not a UtilityManualTrackingSensor, unable to import readings."
+            )
+
+    await asyncio.gather(
+        *(import_sensor(sensor_id) for sensor_id in entities.referenced)
+    )
+
+
+async def handle_get_meter_values(call: ServiceCall) -> ServiceResponse:
+    """Handle the get_meter_values service call."""
+    entities = service.async_extract_referenced_entity_ids(call.hass, call)
+    dates = _get_dates(call.data)
+    timestamps = [date.timestamp() for date in dates]
+
+    response = {}
+    for sensor_id in entities.referenced:
+        sensor = call.hass.data.get(DOMAIN)[sensor_id]
+        if isinstance(sensor, UtilityManualTrackingSensor):
+            response[sensor_id] = [
+                {"date": date.isoformat(), "value": value}
+                for date, value in zip(dates, sensor.evaluate_at(timestamps))
+            ]
+        else:
+            LOGGER.error(
+                f"Entity {sensor_id} is not a UtilityManualTrackingSensor, unable to get values."
+            )
+    return response
+
+
+def _get_dates(data: dict) -> list[datetime]:
+    """Dates of the call: the listed dates, then the range from start to end."""
+    try:
+        dates = [_parse_date(str(date)) for date in data.get("dates") or []]
+        start = _parse_date(str(data["start"])) if data.get("start") else None
+        end = (
+            _parse_date(str(data["end"]))
+            if data.get("end")
+            else datetime.now(timezone.utc)
+        )
+        step = timedelta(hours=float(data.get("step", 1)))
+    except (OverflowError, TypeError, ValueError) as err:
+        raise ServiceValidationError(f"Invalid dates: {err}") from err
+    if start is not None:
+        if step <= timedelta(0):
+            raise ServiceValidationError(
+                f"Invalid step {data.get('step')}, it must be positive"
+            )
+        if (end - start) / step >= MAX_METER_VALUES:
+            raise ServiceValidationError(
+                f"Too many dates, at most {MAX_METER_VALUES} are allowed"
+            )
+        date = start
+        while date <= end:
+            dates.append(date)
+            date += step
+    if len(dates) == 0:
+        raise ServiceValidationError("Either dates or a start date is required")
+    if len(dates) > MAX_METER_VALUES:
+        raise ServiceValidationError(
+            f"Too many dates, at most {MAX_METER_VALUES} are allowed"
+        )
+    return dates
+
+
+def _parse_date(read_date_str: str) -> datetime:
+    return datetime.strptime(read_date_str, DATE_FORMAT).astimezone(timezone.utc)
+
+
+def _add_readings(
+    readings: dict[str | None, list[Datapoint]],
+    rows: list[dict[str, str | float]] | dict[str, list[dict[str, str | float]]],
+) -> None:
+    """Parse raw reading rows, grouped by their (optional) entity_id."""
+    if isinstance(rows, dict):
+        for sensor_id, sensor_rows in rows.items():
+            for row in sensor_rows:
+                _add_readings(readings, [{**row, "entity_id": sensor_id}])
+        return
+
+    for row in rows:
+        try:
+            datapoint = Datapoint(float(row["value"]), _parse_date(str(row["date"])))
+        except (KeyError, TypeError, ValueError) as err:
+            raise ServiceValidationError(f"Invalid reading {row}: {err}") from err
+        readings.setdefault(row.get("entity_id") or None, []).append(datapoint)
+
+
+def _load_readings_file(
+    file_path: str,
+) -> list[dict[str, str | float]] | dict[str, list[dict[str, str | float]]]:
+    """Load reading rows from a CSV (value,date[,entity_id]) or JSON file."""
+    with open(file_path, encoding="utf-8") as file:
+        if file_path.lower().endswith(".json"):
+            return json.load(file)
+        return list(csv.DictReader(file))
@@ -1,19 +1,31 @@
 """Algorithms for utility manual tracking."""
 
 from __future__ import annotations
+from collections.abc import Iterator
 import datetime
+import sys
 
 from dataclasses import dataclass
 
 from custom_components.utility_manual_tracking.fitter import (
     Datapoint,
     Extrapolate,
+    IncrementalFit,
     Interpolate,
+    Series,
 )
 from custom_components.utility_manual_tracking.linear_fitter import (
     LinearExtrapolate,
     LinearInterpolate,
 )
+from custom_components.utility_manual_tracking.pchip_fitter import (
+    PchipExtrapolate,
+    PchipInterpolate,
+)
+from custom_components.utility_manual_tracking.regression_fitter import (
+    RegressionExtrapolate,
+    RegressionInterpolate,
+)
 
 
 @dataclass(frozen=True)
@@ -25,7 +37,9 @@ class Algorithm:
 
 
 ALGORITHMS: dict[str, Algorithm] = {
-    "linear": Algorithm(LinearInterpolate(), LinearExtrapolate())
+    "linear": Algorithm(LinearInterpolate(), LinearExtrapolate()),
+    "regression": Algorithm(RegressionInterpolate(), RegressionExtrapolate()),
+    "pchip": Algorithm(PchipInterpolate(), PchipExtrapolate()),
 }
 
 DEFAULT_ALGORITHM = "linear"
@@ -40,6 +54,86 @@ def interpolate(
     return ALGORITHMS[algorithm].interpolate.guesstimate(old_datapoints, new_datapoint)
 
 
+def interpolate_series(
+    algorithm: str, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+) -> Series:
+    """Interpolate a new datapoint based on old datapoints, as a series."""
+    if algorithm not in ALGORITHMS:
+        algorithm = DEFAULT_ALGORITHM
+    return ALGORITHMS[algorithm].interpolate.guesstimate_series(
+        old_datapoints, new_datapoint
+    )
+
+
+def interpolate_history(
+    algorithm: str, old_datapoints: list[Datapoint], new_datapoints: list[Datapoint]
+) -> Series:
+    """Interpolate the series through all new datapoints in a single pass.
+
+    The resulting series includes the new datapoints themselves.
+    """
+    return Series.concat(
+        interpolate_history_chunks(algorithm, old_datapoints, new_datapoints)
+    )
+
+
+def interpolate_history_chunks(
+    algorithm: str,
+    old_datapoints: list[Datapoint],
+    new_datapoints: list[Datapoint],
+    size: int = sys.maxsize,
+) -> Iterator[Series]:
+    """Interpolate the series through all new datapoints, lazily in chunks.
+
+    Same as interpolate_history, but at most size datapoints are generated
+    at a time, so that arbitrarily long gaps can be streamed.
+    """
+    if algorithm not in ALGORITHMS:
+        algorithm = DEFAULT_ALGORITHM
+    interpolate = ALGORITHMS[algorithm].interpolate
+    reads_seen = list(old_datapoints)
+    for datapoint in new_datapoints:
+        yield from interpolate.guesstimate_chunks(reads_seen, datapoint, size)
+        yield Series.from_datapoints([datapoint])
+        reads_seen.append(datapoint)
+
+
+def interpolate_algorithms_chunks(
+    algorithms: list[str],
+    old_datapoints: list[Datapoint],
+    new_datapoints: list[Datapoint],
+    size: int,
+) -> Iterator[dict[str, Series]]:
+    """Interpolate the series of several algorithms through the new datapoints.
+
+    All the algorithms are walked through the datapoints in lockstep, in
+    chunks of size. Since they all interpolate the same hours, the chunks of
+    each step are aligned and cover the same timestamps.
+    """
+    streams = [
+        Series.batched(
+            interpolate_history_chunks(algorithm, old_datapoints, new_datapoints, size),
+            size,
+        )
+        for algorithm in algorithms
+    ]
+    for chunks in zip(*streams):
+        yield dict(zip(algorithms, chunks))
+
+
+def interpolate_lookback(algorithms: list[str]) -> int:
+    """Number of the latest old datapoints the gaps of the algorithms depend on.
+
+    A datapoint changes the gaps up to that many datapoints after it.
+    """
+    lookback = 1
+    for algorithm in algorithms:
+        if algorithm not in ALGORITHMS:
+            algorithm = DEFAULT_ALGORITHM
+        lookback = max(lookback, ALGORITHMS[algorithm].interpolate.lookback)
+    return lookback
+
+
 def extrapolate(
     algorithm: str | None, datapoints: list[Datapoint], now: datetime.datetime
 ) -> Datapoint:
@@ -47,3 +141,10 @@ def extrapolate(
     if algorithm not in ALGORITHMS:
         algorithm = DEFAULT_ALGORITHM
     return ALGORITHMS[algorithm].extrapolate.guesstimate(datapoints, now)
+
+
+def incremental_fit(algorithm: str | None, window: int | None = None) -> IncrementalFit:
+    """Create a fit over a sliding window, maintained as datapoints are added."""
+    if algorithm not in ALGORITHMS:
+        algorithm = DEFAULT_ALGORITHM
+    return ALGORITHMS[algorithm].extrapolate.incremental(window)
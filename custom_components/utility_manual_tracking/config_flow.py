@@ -3,16 +3,28 @@
 from __future__ import annotations
 
 from typing import Any
+from custom_components.utility_manual_tracking.algorithms import ALGORITHMS
 from custom_components.utility_manual_tracking.consts import (
     CONF_ALGORITHM,
     CONF_METER_CLASS,
     CONF_METER_NAME,
     CONF_METER_UNIT,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_MONTHS,
+    CONF_RETENTION_READS,
+    CONF_SAVE_DELAY,
+    CONF_STATISTICS_ALGORITHMS,
+    CONF_SUMMARY_ATTRIBUTES,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_MONTHS,
+    DEFAULT_RETENTION_READS,
+    DEFAULT_SAVE_DELAY,
     DOMAIN,
 )
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigFlow
+from homeassistant.helpers import config_validation as cv
 
 
 class UtilityManualTrackingConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -26,6 +38,22 @@ class UtilityManualTrackingConfigFlow(ConfigFlow, domain=DOMAIN):
                         vol.Required(CONF_METER_UNIT): str,
                         vol.Required(CONF_METER_CLASS): str,
                         vol.Optional(CONF_ALGORITHM): str,
+                        vol.Optional(
+                            CONF_STATISTICS_ALGORITHMS, default=[]
+                        ): cv.multi_select(list(ALGORITHMS)),
+                        vol.Optional(
+                            CONF_SAVE_DELAY, default=DEFAULT_SAVE_DELAY
+                        ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                        vol.Optional(
+                            CONF_RETENTION_READS, default=DEFAULT_RETENTION_READS
+                        ): vol.All(vol.Coerce(int), vol.Range(min=2)),
+                        vol.Optional(
+                            CONF_RETENTION_DAYS, default=DEFAULT_RETENTION_DAYS
+                        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                        vol.Optional(
+                            CONF_RETENTION_MONTHS, default=DEFAULT_RETENTION_MONTHS
+                        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                        vol.Optional(CONF_SUMMARY_ATTRIBUTES, default=False): bool,
                     }
                 ),
                 errors={},
@@ -38,5 +66,11 @@ class UtilityManualTrackingConfigFlow(ConfigFlow, domain=DOMAIN):
                 CONF_METER_UNIT: user_input[CONF_METER_UNIT],
                 CONF_METER_CLASS: user_input[CONF_METER_CLASS],
                 CONF_ALGORITHM: user_input[CONF_ALGORITHM],
+                CONF_STATISTICS_ALGORITHMS: user_input[CONF_STATISTICS_ALGORITHMS],
+                CONF_SAVE_DELAY: user_input[CONF_SAVE_DELAY],
+                CONF_RETENTION_READS: user_input[CONF_RETENTION_READS],
+                CONF_RETENTION_DAYS: user_input[CONF_RETENTION_DAYS],
+                CONF_RETENTION_MONTHS: user_input[CONF_RETENTION_MONTHS],
+                CONF_SUMMARY_ATTRIBUTES: user_input[CONF_SUMMARY_ATTRIBUTES],
             },
         )
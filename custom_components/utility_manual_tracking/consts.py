@@ -1,5 +1,6 @@
 """Utility Manual Tracking Constants."""
 
+from datetime import timedelta
 import logging
 
 from homeassistant.const import Platform
@@ -10,6 +11,32 @@ CONF_METER_NAME = "meter_name"
 CONF_METER_UNIT = "meter_unit"
 CONF_METER_CLASS = "meter_class"
 CONF_ALGORITHM = "algorithm"
+CONF_STATISTICS_ALGORITHMS = "statistics_algorithms"
+CONF_SAVE_DELAY = "save_delay"
+CONF_STATISTICS_CHUNK_SIZE = "statistics_chunk_size"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_TRACE = "trace"
+CONF_EXECUTION_MODE = "execution_mode"
+CONF_RETENTION_READS = "retention_reads"
+CONF_RETENTION_DAYS = "retention_days"
+CONF_RETENTION_MONTHS = "retention_months"
+CONF_SUMMARY_ATTRIBUTES = "summary_attributes"
+
+DATA_COORDINATOR = "coordinator"
+DATA_CONFIG = "config"
+DATA_EXECUTOR = "executor"
+DATA_LOADER = "loader"
+
+EXPORT_READINGS = "readings"
+EXPORT_SERIES = "series"
+EXPORT_VALUE_COLUMN = "value"
+
+DEFAULT_SCAN_INTERVAL = timedelta(minutes=1)
+DEFAULT_SAVE_DELAY = 10
+DEFAULT_STATISTICS_CHUNK_SIZE = 5000
+DEFAULT_RETENTION_READS = 10
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_RETENTION_MONTHS = 120
 
 ATTRIBUTION = "Data provided by Amber Electric"
 
@@ -0,0 +1,50 @@
+"""Coordinator refreshing the state of all the meters of Utility Manual Tracking."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from custom_components.utility_manual_tracking.consts import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from custom_components.utility_manual_tracking.sensor import (
+        UtilityManualTrackingSensor,
+    )
+
+
+class MeterRefreshCoordinator(DataUpdateCoordinator[dict[str, float | None]]):
+    """Recompute the extrapolated values of all the meters in a single tick.
+
+    Meters register themselves while they are added to Home Assistant, and
+    their states are written in a single pass once the values are computed.
+    """
+
+    def __init__(self, hass: HomeAssistant, update_interval: timedelta) -> None:
+        super().__init__(
+            hass,
+            LOGGER,
+            config_entry=None,
+            name=DOMAIN,
+            update_interval=update_interval,
+        )
+        self.meters: dict[str, UtilityManualTrackingSensor] = {}
+        self.async_add_listener(self._async_write_states)
+
+    async def _async_update_data(self) -> dict[str, float | None]:
+        now = time.time()
+        return {
+            entity_id: meter.evaluate(now) for entity_id, meter in self.meters.items()
+        }
+
+    @callback
+    def _async_write_states(self) -> None:
+        if self.data is None:
+            return
+        for entity_id, meter in self.meters.items():
+            if entity_id in self.data:
+                meter.async_write_value(self.data[entity_id])
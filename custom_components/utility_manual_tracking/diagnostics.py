@@ -0,0 +1,36 @@
+"""Diagnostics for Utility Manual Tracking."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.utility_manual_tracking.consts import (
+    DATA_COORDINATOR,
+    DOMAIN,
+)
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a meter, with its performance counters."""
+    sensor = entry.runtime_data
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    return {
+        "entry": dict(entry.data),
+        "meter": {
+            "entity_id": sensor.entity_id,
+            "algorithm": sensor.algorithm,
+            "statistics_algorithms": sensor.statistics_algorithms,
+            "reads": sensor.reading_count,
+            "trace": sensor.perf.trace,
+        },
+        "coordinator": {
+            "meters": len(coordinator.meters),
+            "update_interval": str(coordinator.update_interval),
+        },
+        "perf": sensor.perf.as_dict(),
+    }
@@ -0,0 +1,102 @@
+"""Execution of the fitter work, on or off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.utility_manual_tracking.algorithms import (
+    interpolate_algorithms_chunks,
+    interpolate_history,
+)
+from custom_components.utility_manual_tracking.consts import LOGGER
+from custom_components.utility_manual_tracking.fitter import Datapoint, Series
+
+EXECUTION_MODE_LOOP = "loop"
+EXECUTION_MODE_EXECUTOR = "executor"
+EXECUTION_MODE_PROCESS = "process"
+EXECUTION_MODES = [
+    EXECUTION_MODE_LOOP,
+    EXECUTION_MODE_EXECUTOR,
+    EXECUTION_MODE_PROCESS,
+]
+
+
+class FitterExecutor:
+    """Run the interpolation of the statistics according to the execution mode.
+
+    - loop: on the event loop, interleaved with the recorder submissions.
+    - executor: chunk by chunk in the Home Assistant executor, so that only
+      the recorder submissions run on the event loop.
+    - process: as executor, except bulk rebuilds (imports and resets) which
+      are computed at once in a process pool.
+    """
+
+    def __init__(self, hass: HomeAssistant, mode: str = EXECUTION_MODE_LOOP) -> None:
+        self._hass = hass
+        self.mode = mode
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    async def async_interpolate_history(
+        self,
+        algorithms: list[str],
+        old_datapoints: list[Datapoint],
+        new_datapoints: list[Datapoint],
+        size: int,
+        bulk: bool = False,
+    ) -> AsyncIterator[dict[str, Series]]:
+        """Interpolate the series of the algorithms through all new datapoints.
+
+        The series are streamed in aligned chunks of size, keyed by algorithm.
+        """
+        if bulk and self.mode == EXECUTION_MODE_PROCESS:
+            pool = self._get_process_pool()
+            series = await asyncio.gather(
+                *(
+                    self._hass.loop.run_in_executor(
+                        pool,
+                        interpolate_history,
+                        algorithm,
+                        old_datapoints,
+                        new_datapoints,
+                    )
+                    for algorithm in algorithms
+                )
+            )
+            for chunks in zip(
+                *(algorithm_series.chunks(size) for algorithm_series in series)
+            ):
+                yield dict(zip(algorithms, chunks))
+            return
+
+        chunks = interpolate_algorithms_chunks(
+            algorithms, old_datapoints, new_datapoints, size
+        )
+        if self.mode == EXECUTION_MODE_LOOP:
+            for chunk in chunks:
+                yield chunk
+            return
+
+        while (
+            chunk := await self._hass.async_add_executor_job(next, chunks, None)
+        ) is not None:
+            yield chunk
+
+    def shutdown(self) -> None:
+        """Shut down the process pool, if it was started."""
+        if self._process_pool is not None:
+            LOGGER.debug("Shutting down the fitter process pool")
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Forking a process with running threads is unsafe, spawn instead
+            self._process_pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
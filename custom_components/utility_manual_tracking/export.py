@@ -0,0 +1,117 @@
+"""Streaming export of the readings and hourly series of the meters."""
+
+from __future__ import annotations
+
+import csv
+from datetime import datetime, timezone
+from http import HTTPStatus
+import io
+import json
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from custom_components.utility_manual_tracking.consts import (
+    DOMAIN,
+    EXPORT_READINGS,
+    EXPORT_SERIES,
+    EXPORT_VALUE_COLUMN,
+    LOGGER,
+)
+from custom_components.utility_manual_tracking.fitter import Series
+from custom_components.utility_manual_tracking.sensor import (
+    UtilityManualTrackingSensor,
+)
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+}
+
+EXPORT_KINDS = [EXPORT_READINGS, EXPORT_SERIES]
+
+TIMESTAMP_COLUMN = "timestamp"
+
+
+def export_columns(sensor: UtilityManualTrackingSensor, kind: str) -> list[str]:
+    """Value columns of the export: the reading, or a series per algorithm."""
+    if kind == EXPORT_READINGS:
+        return [EXPORT_VALUE_COLUMN]
+    return sensor.statistics_algorithms
+
+
+def format_header(columns: list[str], export_format: str) -> str:
+    """Format the header of the export, only CSV has one."""
+    if export_format != EXPORT_FORMAT_CSV:
+        return ""
+    output = io.StringIO()
+    csv.writer(output).writerow([TIMESTAMP_COLUMN, *columns])
+    return output.getvalue()
+
+
+def format_chunk(
+    columns: list[str], chunk: dict[str, Series], export_format: str
+) -> str:
+    """Format an aligned chunk as CSV or NDJSON rows, one per timestamp."""
+    timestamps = [
+        datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        for timestamp in chunk[columns[0]].timestamps
+    ]
+    rows = zip(timestamps, *(chunk[column].values for column in columns))
+    if export_format == EXPORT_FORMAT_NDJSON:
+        keys = [TIMESTAMP_COLUMN, *columns]
+        return "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows)
+
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue()
+
+
+class MeterExportView(HomeAssistantView):
+    """Export the readings (?data=readings) or the hourly series of a meter.
+
+    The export is streamed as CSV (?format=csv, the default) or NDJSON
+    (?format=ndjson), one chunk of statistics_chunk_size rows at a time.
+    """
+
+    url = "/api/utility_manual_tracking/export/{entity_id}"
+    name = "api:utility_manual_tracking:export"
+
+    async def get(self, request: web.Request, entity_id: str) -> web.StreamResponse:
+        """Stream the export of a meter."""
+        hass = request.app[KEY_HASS]
+        sensor = hass.data.get(DOMAIN, {}).get(entity_id)
+        if not isinstance(sensor, UtilityManualTrackingSensor):
+            return self.json_message(
+                f"Entity {entity_id} is not a UtilityManualTrackingSensor",
+                HTTPStatus.NOT_FOUND,
+            )
+        export_format = request.query.get("format", EXPORT_FORMAT_CSV)
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return self.json_message(
+                f"Invalid format {export_format}", HTTPStatus.BAD_REQUEST
+            )
+        kind = request.query.get("data", EXPORT_SERIES)
+        if kind not in EXPORT_KINDS:
+            return self.json_message(f"Invalid data {kind}", HTTPStatus.BAD_REQUEST)
+
+        columns = export_columns(sensor, kind)
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": EXPORT_CONTENT_TYPES[export_format],
+                "Content-Disposition": (
+                    f'attachment; filename="{entity_id}_{kind}.{export_format}"'
+                ),
+            }
+        )
+        await response.prepare(request)
+        await response.write(format_header(columns, export_format).encode())
+        rows = 0
+        async for chunk in sensor.async_export_chunks(kind):
+            await response.write(format_chunk(columns, chunk, export_format).encode())
+            rows += len(chunk[columns[0]])
+        await response.write_eof()
+        LOGGER.debug(f"Exported {rows} rows of {kind} for {entity_id}")
+        return response
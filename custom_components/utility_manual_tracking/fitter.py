@@ -5,13 +5,15 @@ This is used for interpolation and extrapolation of data points.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
 GRANULAR_DELTA = timedelta(hours=1)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Datapoint:
     """Datapoint class."""
 
@@ -34,7 +36,107 @@ class Datapoint:
         )
 
 
+@dataclass
+class Series:
+    """Series of datapoints, as parallel lists of epoch timestamps and values."""
+
+    timestamps: list[float] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, datapoint: Datapoint) -> None:
+        """Append a datapoint to the series."""
+        self.timestamps.append(datapoint.timestamp.timestamp())
+        self.values.append(datapoint.value)
+
+    def extend(self, other: Series) -> None:
+        """Append another series to the series."""
+        self.timestamps.extend(other.timestamps)
+        self.values.extend(other.values)
+
+    def chunks(self, size: int) -> Iterator[Series]:
+        """Split the series into chunks of at most size datapoints."""
+        for i in range(0, len(self.values), size):
+            yield Series(self.timestamps[i : i + size], self.values[i : i + size])
+
+    def datapoints(self) -> list[Datapoint]:
+        """Convert the series to datapoints."""
+        return [
+            Datapoint(value, datetime.fromtimestamp(timestamp, timezone.utc))
+            for timestamp, value in zip(self.timestamps, self.values)
+        ]
+
+    @staticmethod
+    def from_datapoints(datapoints: list[Datapoint]) -> Series:
+        """Convert from datapoints."""
+        return Series(
+            [datapoint.timestamp.timestamp() for datapoint in datapoints],
+            [datapoint.value for datapoint in datapoints],
+        )
+
+    @staticmethod
+    def concat(chunks: Iterable[Series]) -> Series:
+        """Concatenate chunks into a single series."""
+        series = Series()
+        for chunk in chunks:
+            series.extend(chunk)
+        return series
+
+    @staticmethod
+    def batched(chunks: Iterable[Series], size: int) -> Iterator[Series]:
+        """Regroup a stream of chunks into chunks of size datapoints.
+
+        Only the last chunk may be smaller, and at most one chunk is buffered.
+        """
+        batch = Series()
+        for chunk in chunks:
+            start = 0
+            while start < len(chunk):
+                stop = start + size - len(batch)
+                batch.timestamps.extend(chunk.timestamps[start:stop])
+                batch.values.extend(chunk.values[start:stop])
+                start = stop
+                if len(batch) == size:
+                    yield batch
+                    batch = Series()
+        if len(batch) > 0:
+            yield batch
+
+
+@dataclass(frozen=True)
+class Model:
+    """Fitted model, anchored at a timestamp (in epoch seconds).
+
+    The value at any point in time is `value + slope * (now - timestamp)`.
+    """
+
+    value: float
+    timestamp: float
+    slope: float
+
+    def evaluate(self, now: float) -> float:
+        """Evaluate the model at now (in epoch seconds)."""
+        return self.value + self.slope * (now - self.timestamp)
+
+
+def bucket(timestamp: datetime) -> int:
+    """Index of the GRANULAR_DELTA bucket of the timestamp, since the epoch."""
+    return int(timestamp.timestamp() // GRANULAR_DELTA.total_seconds())
+
+
+def missing_steps(start: datetime, end: datetime) -> int:
+    """Number of GRANULAR_DELTA steps from start, strictly before end."""
+    return max(-(-(end - start) // GRANULAR_DELTA) - 1, 0)
+
+
 class Interpolate(ABC):
+    @property
+    def lookback(self) -> int:
+        """Number of the latest old datapoints the values of a gap depend on."""
+        return 1
+
     @abstractmethod
     def guesstimate(
         self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
@@ -42,6 +144,18 @@ class Interpolate(ABC):
         """Guess the values between new and old datapoints."""
         pass
 
+    def guesstimate_series(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> Series:
+        """Guess the values between new and old datapoints, as a series."""
+        return Series.from_datapoints(self.guesstimate(old_datapoints, new_datapoint))
+
+    def guesstimate_chunks(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint, size: int
+    ) -> Iterator[Series]:
+        """Guess the values between new and old datapoints, in chunks of size."""
+        yield from self.guesstimate_series(old_datapoints, new_datapoint).chunks(size)
+
 
 class Extrapolate(ABC):
     @abstractmethod
@@ -50,3 +164,42 @@ class Extrapolate(ABC):
     ) -> Datapoint:
         """Guess the value of now based on datapoints."""
         pass
+
+    @abstractmethod
+    def fit(self, datapoints: list[Datapoint]) -> Model | None:
+        """Fit a model to the datapoints, to be evaluated at any point in time."""
+        pass
+
+    def incremental(self, window: int | None = None) -> IncrementalFit:
+        """Create a fit over a sliding window of the latest datapoints."""
+        return WindowRefit(self, window)
+
+
+class IncrementalFit(ABC):
+    """Fit maintained incrementally, as datapoints are added."""
+
+    @abstractmethod
+    def add(self, datapoint: Datapoint) -> None:
+        """Add the latest datapoint to the fit."""
+        pass
+
+    @abstractmethod
+    def model(self) -> Model | None:
+        """Return the fitted model."""
+        pass
+
+
+class WindowRefit(IncrementalFit):
+    """Fit refitted from scratch over the window on every added datapoint."""
+
+    def __init__(self, extrapolate: Extrapolate, window: int | None) -> None:
+        self._extrapolate = extrapolate
+        self._datapoints: deque[Datapoint] = deque(maxlen=window)
+        self._model: Model | None = None
+
+    def add(self, datapoint: Datapoint) -> None:
+        self._datapoints.append(datapoint)
+        self._model = self._extrapolate.fit(list(self._datapoints))
+
+    def model(self) -> Model | None:
+        return self._model
@@ -0,0 +1,220 @@
+"""Compact in-memory history of meter readings."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from custom_components.utility_manual_tracking.fitter import Datapoint, Model
+
+
+@dataclass(frozen=True)
+class Tier:
+    """Tier of downsampled readings, keeping the latest reading per resolution."""
+
+    resolution: timedelta
+    capacity: int
+
+
+class ReadingHistory:
+    """History of readings, kept as parallel arrays of values and epoch timestamps.
+
+    The latest `maxlen` readings are kept at full resolution. Older readings
+    are downsampled through the tiers, from the finest to the coarsest, each
+    keeping the latest reading of up to `capacity` buckets of `resolution`.
+    Readings older than the last tier are evicted, so without tiers the history
+    behaves as a ring buffer.
+
+    With a resolution, readings within the same bucket of resolution are
+    coalesced, only the latest one of the bucket is kept.
+    """
+
+    def __init__(
+        self,
+        maxlen: int | None = None,
+        tiers: list[Tier] | tuple[Tier, ...] = (),
+        resolution: timedelta | None = None,
+    ) -> None:
+        self.maxlen = maxlen
+        self.tiers = tiers
+        self.resolution = resolution
+        self.values = array("d")
+        self.timestamps = array("d")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, datapoint: Datapoint) -> bool:
+        """Append a reading, evicting the oldest readings beyond maxlen.
+
+        Returns whether the reading was coalesced into the latest one.
+        """
+        coalesced = self._append(datapoint)
+        self.trim()
+        return coalesced
+
+    def extend(self, datapoints: list[Datapoint]) -> None:
+        """Append sorted readings, downsampling once for all of them."""
+        for datapoint in datapoints:
+            self._append(datapoint)
+        self.trim()
+
+    def insert(self, datapoint: Datapoint) -> int:
+        """Insert a reading at its position in time, returning its index.
+
+        A reading with the same timestamp as an existing one replaces it, as
+        well as an earlier one in the same bucket; a reading followed by a
+        later one in the same bucket is dropped. The history is not
+        downsampled, so that the neighbouring readings can be looked up by
+        index; call trim() once done.
+        """
+        timestamp = datapoint.timestamp.timestamp()
+        index = bisect_left(self.timestamps, timestamp)
+        if index < len(self.timestamps) and self.timestamps[index] == timestamp:
+            self.values[index] = datapoint.value
+            return index
+        if index < len(self.timestamps) and self._same_bucket(
+            self.timestamps[index], timestamp
+        ):
+            # The later reading of the bucket wins
+            return index
+        if index > 0 and self._same_bucket(self.timestamps[index - 1], timestamp):
+            self.values[index - 1] = datapoint.value
+            self.timestamps[index - 1] = timestamp
+            return index - 1
+
+        self.values.insert(index, datapoint.value)
+        self.timestamps.insert(index, timestamp)
+        return index
+
+    def index(self, timestamp: datetime) -> int:
+        """Index of the first reading at or after the timestamp."""
+        return bisect_left(self.timestamps, timestamp.timestamp())
+
+    def trim(self) -> None:
+        """Downsample the readings beyond maxlen."""
+        if self.maxlen is not None and len(self.values) > self.maxlen:
+            self._downsample()
+
+    def last(self) -> Datapoint | None:
+        """Return the latest reading."""
+        if len(self.values) == 0:
+            return None
+        return Datapoint(
+            self.values[-1], datetime.fromtimestamp(self.timestamps[-1], timezone.utc)
+        )
+
+    def datapoints(self, start: int = 0, stop: int | None = None) -> list[Datapoint]:
+        """Convert the history (between the start and stop indexes) to datapoints."""
+        return [
+            Datapoint(value, datetime.fromtimestamp(timestamp, timezone.utc))
+            for value, timestamp in zip(
+                self.values[start:stop], self.timestamps[start:stop]
+            )
+        ]
+
+    def as_list(self, start: int = 0) -> list[dict[str, float | str]]:
+        """Serialize (from the start index) to a list of datapoint dicts."""
+        return [datapoint.as_dict() for datapoint in self.datapoints(start)]
+
+    def segments(self, model: Model | None = None) -> SegmentIndex:
+        """Index the readings as segments, extrapolated past the last one by model."""
+        timestamps = array("d", self.timestamps)
+        intercepts = array("d", self.values)
+        slopes = array(
+            "d",
+            (
+                (self.values[i + 1] - self.values[i])
+                / (self.timestamps[i + 1] - self.timestamps[i])
+                for i in range(len(self.values) - 1)
+            ),
+        )
+        if len(timestamps) > 0:
+            if model is not None:
+                intercepts[-1] = model.evaluate(timestamps[-1])
+            slopes.append(model.slope if model is not None else 0)
+        return SegmentIndex(timestamps, intercepts, slopes)
+
+    @staticmethod
+    def from_list(
+        data: list[dict[str, float | str]],
+        maxlen: int | None = None,
+        tiers: list[Tier] | tuple[Tier, ...] = (),
+        resolution: timedelta | None = None,
+    ) -> ReadingHistory:
+        """Deserialize from a list of datapoint dicts."""
+        history = ReadingHistory(maxlen, tiers, resolution)
+        history.extend([Datapoint.from_dict(read) for read in data])
+        return history
+
+    def _append(self, datapoint: Datapoint) -> bool:
+        timestamp = datapoint.timestamp.timestamp()
+        if len(self.timestamps) > 0 and self._same_bucket(
+            self.timestamps[-1], timestamp
+        ):
+            self.values[-1] = datapoint.value
+            self.timestamps[-1] = timestamp
+            return True
+        self.values.append(datapoint.value)
+        self.timestamps.append(timestamp)
+        return False
+
+    def _same_bucket(self, timestamp: float, other_timestamp: float) -> bool:
+        if self.resolution is None:
+            return False
+        resolution = self.resolution.total_seconds()
+        return timestamp // resolution == other_timestamp // resolution
+
+    def _downsample(self) -> None:
+        """Downsample the readings beyond maxlen through the tiers."""
+        i = len(self.timestamps) - self.maxlen - 1
+        keep = list(range(len(self.timestamps) - 1, i, -1))
+        for tier in self.tiers:
+            resolution = tier.resolution.total_seconds()
+            bucket = None
+            kept = 0
+            # Walk from the latest to the oldest reading, so that the latest
+            # reading of each bucket is kept
+            while i >= 0:
+                reading_bucket = self.timestamps[i] // resolution
+                if reading_bucket != bucket:
+                    if kept == tier.capacity:
+                        break
+                    bucket = reading_bucket
+                    kept += 1
+                    keep.append(i)
+                i -= 1
+
+        keep.reverse()
+        self.values = array("d", (self.values[i] for i in keep))
+        self.timestamps = array("d", (self.timestamps[i] for i in keep))
+
+
+@dataclass(frozen=True)
+class SegmentIndex:
+    """Piecewise linear index over the readings, to evaluate them in batch.
+
+    Segment i starts at timestamps[i] with the value intercepts[i], and grows
+    by slopes[i] per second until the next one. The last segment extends
+    indefinitely; there is no value before the first one.
+    """
+
+    timestamps: array
+    intercepts: array
+    slopes: array
+
+    def evaluate(self, timestamps: list[float]) -> list[float | None]:
+        """Evaluate the segments at the timestamps (in epoch seconds)."""
+        values = []
+        for timestamp in timestamps:
+            i = bisect_right(self.timestamps, timestamp) - 1
+            if i < 0:
+                values.append(None)
+            else:
+                values.append(
+                    self.intercepts[i]
+                    + self.slopes[i] * (timestamp - self.timestamps[i])
+                )
+        return values
@@ -1,15 +1,26 @@
 """Implementation of a linear fitter for the utility manual tracking component."""
 
 from __future__ import annotations
+from collections.abc import Iterator
 import datetime
+from itertools import accumulate, repeat
+import sys
 
 from custom_components.utility_manual_tracking.fitter import (
     GRANULAR_DELTA,
     Datapoint,
     Extrapolate,
     Interpolate,
+    Model,
+    Series,
+    missing_steps,
 )
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class LinearInterpolate(Interpolate):
     def guesstimate(
@@ -36,6 +47,60 @@ class LinearInterpolate(Interpolate):
             missing_value += slope
         return missing_datapoints
 
+    def guesstimate_series(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> Series:
+        return Series.concat(
+            self.guesstimate_chunks(old_datapoints, new_datapoint, sys.maxsize)
+        )
+
+    def guesstimate_chunks(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint, size: int
+    ) -> Iterator[Series]:
+        if len(old_datapoints) == 0:
+            return
+
+        latest_old_datapoint = old_datapoints[-1]
+
+        count = missing_steps(latest_old_datapoint.timestamp, new_datapoint.timestamp)
+        if count == 0:
+            return
+
+        difference_time = (
+            new_datapoint.timestamp - latest_old_datapoint.timestamp
+        ).total_seconds() / GRANULAR_DELTA.total_seconds()
+        difference = new_datapoint.value - latest_old_datapoint.value
+        slope = difference / difference_time
+
+        # Values are accumulated sequentially (rather than computed as
+        # value + slope * i) to produce exactly the same values as guesstimate,
+        # carrying the last value over from one chunk to the next
+        value = latest_old_datapoint.value
+        first_timestamp = latest_old_datapoint.timestamp.timestamp()
+        step = GRANULAR_DELTA.total_seconds()
+        for start in range(0, count, size):
+            length = min(size, count - start)
+            if np is not None:
+                values = np.full(length, slope)
+                values[0] = value + slope
+                chunk = Series(
+                    (
+                        first_timestamp
+                        + step * np.arange(start + 1, start + length + 1)
+                    ).tolist(),
+                    np.cumsum(values).tolist(),
+                )
+            else:
+                chunk = Series(
+                    [
+                        first_timestamp + step * i
+                        for i in range(start + 1, start + length + 1)
+                    ],
+                    list(accumulate(repeat(slope, length - 1), initial=value + slope)),
+                )
+            value = chunk.values[-1]
+            yield chunk
+
 
 class LinearExtrapolate(Extrapolate):
     def guesstimate(
@@ -62,3 +127,25 @@ class LinearExtrapolate(Extrapolate):
             + slope * (now - latest_datapoint.timestamp).total_seconds(),
             now,
         )
+
+    def fit(self, datapoints: list[Datapoint]) -> Model | None:
+        if len(datapoints) == 0:
+            return None
+
+        latest_datapoint = datapoints[-1]
+        if len(datapoints) == 1:
+            return Model(
+                latest_datapoint.value, latest_datapoint.timestamp.timestamp(), 0
+            )
+
+        second_latest_datapoint = datapoints[-2]
+        difference_secs = (
+            latest_datapoint.timestamp - second_latest_datapoint.timestamp
+        ).total_seconds()
+        difference = latest_datapoint.value - second_latest_datapoint.value
+
+        return Model(
+            latest_datapoint.value,
+            latest_datapoint.timestamp.timestamp(),
+            difference / difference_secs,
+        )
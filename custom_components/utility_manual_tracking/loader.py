@@ -0,0 +1,68 @@
+"""Concurrent loading of the meter stores at startup."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from custom_components.utility_manual_tracking.consts import (
+    CONF_METER_CLASS,
+    CONF_METER_NAME,
+    DOMAIN,
+    LOGGER,
+)
+
+
+def meter_unique_id(meter_name: str, meter_class: str) -> str:
+    """Unique id of a meter, also the key of its store."""
+    return f"{DOMAIN}_{meter_name.lower().replace(' ', '_')}_{meter_class.lower()}"
+
+
+def create_store(hass: HomeAssistant, unique_id: str) -> Store[dict]:
+    """Create the store of the readings of a meter."""
+    return Store[dict](
+        hass,
+        1,
+        unique_id,
+        private=True,
+        atomic_writes=True,
+        minor_version=2,
+    )
+
+
+class MeterStoreLoader:
+    """Load the stores of all the meters concurrently, ahead of their setup.
+
+    Without it, each config entry loads its store when it sets up its sensor,
+    one after the other.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._tasks: dict[str, asyncio.Task[dict | None]] = {}
+
+    @callback
+    def async_preload(self, entries: list[ConfigEntry]) -> None:
+        """Start loading the stores of the meters of the (enabled) entries."""
+        for entry in entries:
+            if entry.disabled_by is not None:
+                continue
+            store = create_store(
+                self._hass,
+                meter_unique_id(
+                    entry.data[CONF_METER_NAME], entry.data[CONF_METER_CLASS]
+                ),
+            )
+            self._tasks[store.key] = self._hass.async_create_task(
+                store.async_load(), f"{DOMAIN} preload {store.key}"
+            )
+        LOGGER.debug(f"Preloading {len(self._tasks)} meter stores")
+
+    async def async_load(self, store: Store[dict]) -> dict | None:
+        """Return the preloaded data of the store, or load it if it was not."""
+        if (task := self._tasks.pop(store.key, None)) is not None:
+            return await task
+        return await store.async_load()
@@ -0,0 +1,183 @@
+"""Implementation of a monotone cubic (PCHIP) fitter for the utility manual tracking component."""
+
+from __future__ import annotations
+from collections.abc import Iterator
+import datetime
+from functools import lru_cache
+import math
+import sys
+
+from custom_components.utility_manual_tracking.fitter import (
+    GRANULAR_DELTA,
+    Datapoint,
+    Extrapolate,
+    IncrementalFit,
+    Interpolate,
+    Model,
+    Series,
+    WindowRefit,
+    missing_steps,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Datapoints the slope at a reading is estimated from, the reading included
+SLOPE_DATAPOINTS = 3
+
+Point = tuple[float, float]
+
+
+@lru_cache(maxsize=1024)
+def end_slope(points: tuple[Point, ...]) -> float | None:
+    """Slope at the last of the points (in epoch seconds, value), per GRANULAR_DELTA.
+
+    The one-sided three-point estimate of PCHIP, limited to keep the curve
+    monotone. The slope at a reading is first computed as the end of the
+    segment before it, then reused (cached) as the start of the next one.
+    """
+    if len(points) < 2:
+        return None
+
+    (t1, v1), (t2, v2) = points[-2:]
+    h2 = (t2 - t1) / GRANULAR_DELTA.total_seconds()
+    delta2 = (v2 - v1) / h2
+    if len(points) < 3:
+        return delta2
+
+    t0, v0 = points[-3]
+    h1 = (t1 - t0) / GRANULAR_DELTA.total_seconds()
+    delta1 = (v1 - v0) / h1
+    slope = ((2 * h2 + h1) * delta2 - h2 * delta1) / (h1 + h2)
+    if slope * delta2 <= 0:
+        return 0
+    if delta1 * delta2 < 0 and abs(slope) > 3 * abs(delta2):
+        return 3 * delta2
+    return slope
+
+
+@lru_cache(maxsize=1024)
+def segment_coefficients(points: tuple[Point, ...]) -> tuple[float, float, float]:
+    """Coefficients of the cubic bridging the last two points, per GRANULAR_DELTA.
+
+    The value at s steps from the first of the two is
+    `value + s * (slope + s * (quadratic + s * cubic))`, returned as
+    (slope, quadratic, cubic). The slopes at both ends are limited as in
+    Fritsch-Carlson, so that the cubic is monotone.
+    """
+    (t0, v0), (t1, v1) = points[-2:]
+    h = (t1 - t0) / GRANULAR_DELTA.total_seconds()
+    delta = (v1 - v0) / h
+    if delta == 0:
+        return 0, 0, 0
+
+    start_slope = end_slope(points[-SLOPE_DATAPOINTS - 1 : -1])
+    alpha = start_slope / delta if start_slope is not None else 1
+    beta = end_slope(points[-SLOPE_DATAPOINTS:]) / delta
+    alpha, beta = max(alpha, 0), max(beta, 0)
+    if alpha * alpha + beta * beta > 9:
+        tau = 3 / math.sqrt(alpha * alpha + beta * beta)
+        alpha, beta = tau * alpha, tau * beta
+    return (
+        alpha * delta,
+        (3 - 2 * alpha - beta) * delta / h,
+        (alpha + beta - 2) * delta / (h * h),
+    )
+
+
+def _points(datapoints: list[Datapoint]) -> tuple[Point, ...]:
+    return tuple(
+        (datapoint.timestamp.timestamp(), datapoint.value) for datapoint in datapoints
+    )
+
+
+class PchipInterpolate(Interpolate):
+    """Bridge gaps with a monotone piecewise cubic Hermite curve (PCHIP).
+
+    The curve goes through the readings, with the same slope on both sides of
+    a reading, so that the statistics do not kink at the readings. Since the
+    readings after the new one are not known yet, the slope at the new
+    reading is estimated from the readings before it.
+    """
+
+    @property
+    def lookback(self) -> int:
+        return SLOPE_DATAPOINTS
+
+    def guesstimate(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> list[Datapoint]:
+        return self.guesstimate_series(old_datapoints, new_datapoint).datapoints()
+
+    def guesstimate_series(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> Series:
+        return Series.concat(
+            self.guesstimate_chunks(old_datapoints, new_datapoint, sys.maxsize)
+        )
+
+    def guesstimate_chunks(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint, size: int
+    ) -> Iterator[Series]:
+        if len(old_datapoints) == 0:
+            return
+
+        latest_old_datapoint = old_datapoints[-1]
+        count = missing_steps(latest_old_datapoint.timestamp, new_datapoint.timestamp)
+        if count == 0:
+            return
+
+        slope, quadratic, cubic = segment_coefficients(
+            _points([*old_datapoints[-SLOPE_DATAPOINTS:], new_datapoint])
+        )
+        value = latest_old_datapoint.value
+        first_timestamp = latest_old_datapoint.timestamp.timestamp()
+        step = GRANULAR_DELTA.total_seconds()
+        for start in range(0, count, size):
+            stop = min(start + size, count)
+            if np is not None:
+                steps = np.arange(start + 1, stop + 1)
+                yield Series(
+                    (first_timestamp + step * steps).tolist(),
+                    (
+                        value + steps * (slope + steps * (quadratic + steps * cubic))
+                    ).tolist(),
+                )
+            else:
+                yield Series(
+                    [first_timestamp + step * i for i in range(start + 1, stop + 1)],
+                    [
+                        value + i * (slope + i * (quadratic + i * cubic))
+                        for i in range(start + 1, stop + 1)
+                    ],
+                )
+
+
+class PchipExtrapolate(Extrapolate):
+    """Extrapolate with the slope of the PCHIP curve at the last reading."""
+
+    def guesstimate(
+        self, datapoints: list[Datapoint], now: datetime.datetime
+    ) -> Datapoint:
+        model = self.fit(datapoints)
+        if model is None:
+            return None
+        return Datapoint(model.evaluate(now.timestamp()), now)
+
+    def fit(self, datapoints: list[Datapoint]) -> Model | None:
+        if len(datapoints) == 0:
+            return None
+
+        latest_datapoint = datapoints[-1]
+        slope = end_slope(_points(datapoints[-SLOPE_DATAPOINTS:]))
+        return Model(
+            latest_datapoint.value,
+            latest_datapoint.timestamp.timestamp(),
+            (slope or 0) / GRANULAR_DELTA.total_seconds(),
+        )
+
+    def incremental(self, window: int | None = None) -> IncrementalFit:
+        # Only the latest datapoints contribute to the slope
+        return WindowRefit(self, SLOPE_DATAPOINTS)
@@ -0,0 +1,104 @@
+"""Lightweight timing counters for the hot paths of the meters."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+import time
+from typing import TypeVar
+
+from custom_components.utility_manual_tracking.consts import LOGGER
+
+T = TypeVar("T")
+
+OPERATIONS = (
+    "set_value",
+    "interpolate",
+    "backfill_statistics",
+    "store_save",
+    "evaluate",
+    "write_state",
+    "load",
+)
+
+
+@dataclass(slots=True)
+class Counter:
+    """Call count, cumulative and max latency (in seconds) and rows of an operation."""
+
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    rows: int = 0
+
+    @property
+    def mean(self) -> float:
+        """Mean latency (in seconds)."""
+        return self.total / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Convert to dict, with the mean latency."""
+        return {**asdict(self), "mean": self.mean}
+
+
+class PerfCounters:
+    """Timing counters of the operations of a meter.
+
+    With trace enabled, every call is also logged at debug level.
+    """
+
+    def __init__(self, name: str, trace: bool = False) -> None:
+        self.name = name
+        self.trace = trace
+        self.counters: dict[str, Counter] = {
+            operation: Counter() for operation in OPERATIONS
+        }
+
+    @contextmanager
+    def measure(self, operation: str) -> Iterator[Counter]:
+        """Time the block, yielding the counter so that rows can be added."""
+        counter = self.counters.setdefault(operation, Counter())
+        started = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            self._record(operation, counter, time.perf_counter() - started)
+
+    async def measure_aiter(
+        self,
+        operation: str,
+        iterable: AsyncIterable[T],
+        rows: Callable[[T], int] = len,
+    ) -> AsyncIterator[T]:
+        """Time the production of the items of a lazy iterable, as one call.
+
+        The rows of every item are counted with rows, its length by default.
+        """
+        counter = self.counters.setdefault(operation, Counter())
+        iterator = aiter(iterable)
+        elapsed = 0.0
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            counter.rows += rows(item)
+            yield item
+        self._record(operation, counter, elapsed)
+
+    def as_dict(self) -> dict[str, dict[str, float | int]]:
+        """Convert all the counters to dicts."""
+        return {
+            operation: counter.as_dict() for operation, counter in self.counters.items()
+        }
+
+    def _record(self, operation: str, counter: Counter, elapsed: float) -> None:
+        counter.calls += 1
+        counter.total += elapsed
+        counter.max = max(counter.max, elapsed)
+        if self.trace:
+            LOGGER.debug(f"{self.name}: {operation} took {elapsed * 1000:.3f} ms")
@@ -0,0 +1,184 @@
+"""Implementation of a least-squares regression fitter for the utility manual tracking component."""
+
+from __future__ import annotations
+from collections import deque
+from collections.abc import Iterator
+import datetime
+import sys
+
+from custom_components.utility_manual_tracking.fitter import (
+    GRANULAR_DELTA,
+    Datapoint,
+    Extrapolate,
+    IncrementalFit,
+    Interpolate,
+    Model,
+    Series,
+    missing_steps,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_WINDOW = 10
+
+
+class RunningRegression(IncrementalFit):
+    """Least-squares regression over a sliding window of datapoints.
+
+    The sums Σt, Σv, Σt², Σtv are updated in O(1) as datapoints are added to
+    and evicted from the window. Timestamps are in hours since the first
+    datapoint added, to keep the sums numerically stable.
+    """
+
+    def __init__(self, window: int | None = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._datapoints: deque[tuple[float, float]] = deque()
+        self._origin: float | None = None
+        self._sum_t = 0.0
+        self._sum_v = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+
+    def add(self, datapoint: Datapoint) -> None:
+        timestamp = datapoint.timestamp.timestamp()
+        if self._origin is None:
+            self._origin = timestamp
+        t = (timestamp - self._origin) / GRANULAR_DELTA.total_seconds()
+        v = datapoint.value
+
+        self._datapoints.append((t, v))
+        self._sum_t += t
+        self._sum_v += v
+        self._sum_tt += t * t
+        self._sum_tv += t * v
+
+        if self._window is not None and len(self._datapoints) > self._window:
+            t, v = self._datapoints.popleft()
+            self._sum_t -= t
+            self._sum_v -= v
+            self._sum_tt -= t * t
+            self._sum_tv -= t * v
+
+    def slope(self) -> float:
+        """Return the slope of the regression, per GRANULAR_DELTA."""
+        n = len(self._datapoints)
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if n < 2 or denominator <= 0:
+            return 0
+        return (n * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+    def model(self) -> Model | None:
+        n = len(self._datapoints)
+        if n == 0:
+            return None
+
+        # The regression line goes through the mean of the datapoints
+        mean_t = self._sum_t / n
+        return Model(
+            self._sum_v / n,
+            self._origin + mean_t * GRANULAR_DELTA.total_seconds(),
+            self.slope() / GRANULAR_DELTA.total_seconds(),
+        )
+
+
+class RegressionInterpolate(Interpolate):
+    """Bridge gaps following the regression slope.
+
+    The bridge is quadratic: it leaves the latest old datapoint with the slope
+    of the regression over the window (new datapoint included), and lands
+    exactly on the new datapoint. The starting slope is clamped between 0 and
+    twice the average slope of the gap, which keeps the bridge monotone.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+
+    @property
+    def lookback(self) -> int:
+        # The new datapoint completes the window
+        return self._window - 1
+
+    def guesstimate(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> list[Datapoint]:
+        return self.guesstimate_series(old_datapoints, new_datapoint).datapoints()
+
+    def guesstimate_series(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint
+    ) -> Series:
+        return Series.concat(
+            self.guesstimate_chunks(old_datapoints, new_datapoint, sys.maxsize)
+        )
+
+    def guesstimate_chunks(
+        self, old_datapoints: list[Datapoint], new_datapoint: Datapoint, size: int
+    ) -> Iterator[Series]:
+        if len(old_datapoints) == 0:
+            return
+
+        latest_old_datapoint = old_datapoints[-1]
+        count = missing_steps(latest_old_datapoint.timestamp, new_datapoint.timestamp)
+        if count == 0:
+            return
+
+        regression = RunningRegression(self._window)
+        for datapoint in old_datapoints[-self._window + 1 :]:
+            regression.add(datapoint)
+        regression.add(new_datapoint)
+
+        difference_time = (
+            new_datapoint.timestamp - latest_old_datapoint.timestamp
+        ).total_seconds() / GRANULAR_DELTA.total_seconds()
+        difference = new_datapoint.value - latest_old_datapoint.value
+        average_slope = difference / difference_time
+        low, high = sorted((0, 2 * average_slope))
+        slope = min(max(regression.slope(), low), high)
+        curvature = (difference - slope * difference_time) / difference_time**2
+
+        first_timestamp = latest_old_datapoint.timestamp.timestamp()
+        step = GRANULAR_DELTA.total_seconds()
+        for start in range(0, count, size):
+            stop = min(start + size, count)
+            if np is not None:
+                steps = np.arange(start + 1, stop + 1)
+                yield Series(
+                    (first_timestamp + step * steps).tolist(),
+                    (
+                        latest_old_datapoint.value + steps * (slope + curvature * steps)
+                    ).tolist(),
+                )
+            else:
+                yield Series(
+                    [first_timestamp + step * i for i in range(start + 1, stop + 1)],
+                    [
+                        latest_old_datapoint.value + i * (slope + curvature * i)
+                        for i in range(start + 1, stop + 1)
+                    ],
+                )
+
+
+class RegressionExtrapolate(Extrapolate):
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+
+    def guesstimate(
+        self, datapoints: list[Datapoint], now: datetime.datetime
+    ) -> Datapoint:
+        model = self.fit(datapoints)
+        if model is None:
+            return None
+        return Datapoint(model.evaluate(now.timestamp()), now)
+
+    def fit(self, datapoints: list[Datapoint]) -> Model | None:
+        regression = self.incremental()
+        for datapoint in datapoints[-self._window :]:
+            regression.add(datapoint)
+        return regression.model()
+
+    def incremental(self, window: int | None = None) -> IncrementalFit:
+        if window is None or window > self._window:
+            window = self._window
+        return RunningRegression(window)
@@ -3,33 +3,79 @@
 from __future__ import annotations
 
 import asyncio
-
-from datetime import datetime, timezone
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import asdict
+from datetime import datetime, timedelta
 import json
+import time
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.storage import Store
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.utility_manual_tracking.algorithms import (
     DEFAULT_ALGORITHM,
-    extrapolate,
-    interpolate,
+    incremental_fit,
+    interpolate_lookback,
 )
 from custom_components.utility_manual_tracking.consts import (
     CONF_ALGORITHM,
+    CONF_DIAGNOSTIC_SENSORS,
     CONF_METER_CLASS,
     CONF_METER_NAME,
     CONF_METER_UNIT,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_MONTHS,
+    CONF_RETENTION_READS,
+    CONF_SAVE_DELAY,
+    CONF_STATISTICS_ALGORITHMS,
+    CONF_STATISTICS_CHUNK_SIZE,
+    CONF_SUMMARY_ATTRIBUTES,
+    CONF_TRACE,
+    DATA_CONFIG,
+    DATA_COORDINATOR,
+    DATA_EXECUTOR,
+    DATA_LOADER,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_MONTHS,
+    DEFAULT_RETENTION_READS,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_STATISTICS_CHUNK_SIZE,
     DOMAIN,
+    EXPORT_READINGS,
+    EXPORT_VALUE_COLUMN,
     LOGGER,
 )
-from custom_components.utility_manual_tracking.fitter import Datapoint
-from custom_components.utility_manual_tracking.statistics import (
-    backfill_statistics,
-    reset_statistics,
+from custom_components.utility_manual_tracking.coordinator import (
+    MeterRefreshCoordinator,
+)
+from custom_components.utility_manual_tracking.executor import FitterExecutor
+from custom_components.utility_manual_tracking.fitter import (
+    GRANULAR_DELTA,
+    Datapoint,
+    IncrementalFit,
+    Model,
+    Series,
+    bucket,
+)
+from custom_components.utility_manual_tracking.history import (
+    ReadingHistory,
+    SegmentIndex,
+    Tier,
+)
+from custom_components.utility_manual_tracking.loader import (
+    MeterStoreLoader,
+    create_store,
+    meter_unique_id,
 )
+from custom_components.utility_manual_tracking.perf import OPERATIONS, PerfCounters
+
+# Imported on the first backfill, as it pulls in the recorder statistics
+STATISTICS_MODULE = "custom_components.utility_manual_tracking.statistics"
 
 
 async def async_setup_entry(
@@ -37,24 +83,42 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    config = hass.data[DOMAIN][DATA_CONFIG]
     sensor = UtilityManualTrackingSensor(
         hass,
         entry.data[CONF_METER_NAME],
         entry.data[CONF_METER_UNIT],
         entry.data[CONF_METER_CLASS],
         entry.data[CONF_ALGORITHM],
+        entry.data.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY),
+        entry.data.get(CONF_RETENTION_READS, DEFAULT_RETENTION_READS),
+        entry.data.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS),
+        entry.data.get(CONF_RETENTION_MONTHS, DEFAULT_RETENTION_MONTHS),
+        config.get(CONF_STATISTICS_CHUNK_SIZE, DEFAULT_STATISTICS_CHUNK_SIZE),
+        config.get(CONF_TRACE, False),
+        hass.data[DOMAIN][DATA_EXECUTOR],
+        entry.data.get(CONF_STATISTICS_ALGORITHMS, []),
+        entry.data.get(CONF_SUMMARY_ATTRIBUTES, False),
     )
-    await sensor._load_attributes()
+    await sensor._load_attributes(hass.data[DOMAIN].get(DATA_LOADER))
     hass.data.get(DOMAIN)[sensor.entity_id] = sensor
+    entry.runtime_data = sensor
     LOGGER.info(
         f"Setting up Utility Manual Tracking sensor: {sensor.entity_id} with name {sensor.name}"
     )
 
-    async_add_entities([sensor])
+    entities: list[SensorEntity] = [sensor]
+    if config.get(CONF_DIAGNOSTIC_SENSORS, False):
+        coordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+        entities.extend(
+            MeterPerfSensor(coordinator, sensor, operation) for operation in OPERATIONS
+        )
+    async_add_entities(entities)
 
 
 class UtilityManualTrackingSensor(SensorEntity):
-    MAX_PREVIOUS_READS = 10
+    # The state is refreshed by the integration's MeterRefreshCoordinator
+    _attr_should_poll = False
 
     def __init__(
         self,
@@ -63,11 +127,18 @@ class UtilityManualTrackingSensor(SensorEntity):
         meter_unit: str,
         meter_class: str,
         algorithm: str | None,
+        save_delay: float = DEFAULT_SAVE_DELAY,
+        retention_reads: int = DEFAULT_RETENTION_READS,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        retention_months: int = DEFAULT_RETENTION_MONTHS,
+        statistics_chunk_size: int = DEFAULT_STATISTICS_CHUNK_SIZE,
+        trace: bool = False,
+        executor: FitterExecutor | None = None,
+        statistics_algorithms: list[str] | None = None,
+        summary_attributes: bool = False,
     ) -> None:
         super().__init__()
-        self._attr_unique_id = (
-            f"{DOMAIN}_{meter_name.lower().replace(' ', '_')}_{meter_class.lower()}"
-        )
+        self._attr_unique_id = meter_unique_id(meter_name, meter_class)
         self._attr_name = meter_name
         self._attr_device_class = meter_class
         self._attr_native_unit_of_measurement = meter_unit
@@ -75,159 +146,577 @@ class UtilityManualTrackingSensor(SensorEntity):
         self.entity_id = f"sensor.{self._attr_unique_id}"
 
         self._algorithm: str = algorithm.lower() if algorithm else DEFAULT_ALGORITHM
-        self._last_read_value: float = None
-        self._last_updated: datetime | None = None
-        self._previous_reads: list[dict[str, float | str]] = []
-        self._store = Store[dict](
-            hass, 1, self._attr_unique_id, private=True, atomic_writes=True
+        # Other algorithms for which statistics are maintained, e.g. to compare
+        self._extra_algorithms: list[str] = statistics_algorithms or []
+        # The previous reads and the last read, the latest ones at full
+        # resolution and older ones downsampled to daily then monthly readings
+        self._retention_reads = retention_reads
+        self._retention_tiers = [
+            Tier(timedelta(days=1), retention_days),
+            Tier(timedelta(days=30), retention_months),
+        ]
+        self._history = ReadingHistory(
+            retention_reads, self._retention_tiers, GRANULAR_DELTA
+        )
+        # State attributes, cached until the history changes
+        self._summary_attributes_only = summary_attributes
+        self._attributes: dict[str, any] | None = None
+        # Segments to evaluate the meter at any time, indexed until it changes
+        self._segments: SegmentIndex | None = None
+        # None when the model was restored from storage, until the next reading
+        self._fit: IncrementalFit | None = incremental_fit(
+            self._algorithm, retention_reads
         )
+        self._model: Model | None = None
+        self._save_delay = save_delay
+        self._statistics_chunk_size = statistics_chunk_size
+        self.perf = PerfCounters(self.entity_id, trace)
+        self._executor = executor or FitterExecutor(hass)
+        self._save_pending = False
+        # Previous reads of the latest bucket, whose statistics are not written yet
+        self._pending_statistics: list[Datapoint] | None = None
+        self._unsub_statistics: CALLBACK_TYPE | None = None
+        self._store = create_store(hass, self._attr_unique_id)
+        # Serializes the changes to the readings and statistics of the meter
+        self._lock = asyncio.Lock()
+        # Readings waiting to be committed by the worker, in arrival order
+        self._queued: list[tuple[Datapoint, asyncio.Future[None]]] = []
+        self._worker: asyncio.Task[None] | None = None
 
-    def set_value(self, value, date_utc) -> None:
-        """Update the sensor state."""
-        if self._last_read_value:
-            if self._last_updated >= date_utc:
-                raise ValueError(
-                    f"New reading {date_utc} cannot be earlier than the last read {self._last_updated}"
-                )
+    async def async_set_value(self, value, date_utc) -> None:
+        """Queue a reading, returning once it is committed.
 
-            self._previous_reads.append(
-                Datapoint(self._last_read_value, self._last_updated).as_dict()
+        The readings queued while a batch is being committed are committed
+        together as the next batch, in a single backfill and save.
+        """
+        future = self.hass.loop.create_future()
+        self._queued.append((Datapoint(value, date_utc), future))
+        if self._worker is None:
+            self._worker = self.hass.async_create_task(
+                self._async_commit_queued(), f"{self.entity_id} commit"
             )
-            # Limit the number of previous reads to MAX_PREVIOUS_READS
-            self._previous_reads = self._previous_reads[-self.MAX_PREVIOUS_READS :]
+        await future
 
-        self._last_read_value = value
-        self._last_updated = date_utc
+    async def _async_commit_queued(self) -> None:
+        """Commit the queued readings, batch by batch, until none is left."""
+        try:
+            while self._queued:
+                batch, self._queued = self._queued, []
+                try:
+                    async with self._lock:
+                        await self._async_commit_values(
+                            [datapoint for datapoint, _ in batch]
+                        )
+                except Exception as err:  # Raised to the callers of the batch
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(err)
+                else:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result(None)
+        finally:
+            self._worker = None
 
-        missing_data = interpolate(
-            self._algorithm,
-            [Datapoint.from_dict(read) for read in self._previous_reads],
-            Datapoint(self._last_read_value, self._last_updated),
-        )
+    async def _async_commit_values(self, datapoints: list[Datapoint]) -> None:
+        """Commit a batch of readings: late ones first, then the newer ones."""
+        with self.perf.measure("set_value") as counter:
+            counter.rows += len(datapoints)
+            last_read = self._history.last()
+            late_datapoints = sorted(
+                (
+                    datapoint
+                    for datapoint in datapoints
+                    if last_read is not None
+                    and datapoint.timestamp <= last_read.timestamp
+                ),
+                key=lambda datapoint: datapoint.timestamp,
+            )
+            new_datapoints = [
+                datapoint
+                for datapoint in datapoints
+                if last_read is None or datapoint.timestamp > last_read.timestamp
+            ]
+            if len(late_datapoints) > 0:
+                await self._async_insert_values(late_datapoints)
+            if len(new_datapoints) == 1:
+                await self._async_append_value(new_datapoints[0])
+            elif len(new_datapoints) > 1:
+                await self._async_extend_values(new_datapoints)
 
-        LOGGER.debug(
-            f"Interpolating missing data with algorithm {self._algorithm}: {missing_data}"
-        )
+    async def _async_append_value(self, datapoint: Datapoint) -> None:
+        """Append a reading newer than the last one.
 
+        Readings within the same GRANULAR_DELTA bucket are coalesced: only the
+        latest one is kept, and the statistics of the bucket are written once,
+        when it is over or when a reading of a later bucket comes in.
+        """
+        last_read = self._history.last()
+        if last_read is not None and bucket(last_read.timestamp) == bucket(
+            datapoint.timestamp
+        ):
+            previous_reads = self._history.datapoints(-self._retention_reads - 1, -1)
+            self._history.append(datapoint)
+            self._fit_model()
+        else:
+            await self._async_flush_statistics()
+            previous_reads = self._history.datapoints(-self._retention_reads)
+            if self._fit is None:
+                self._fit_model()
+            self._history.append(datapoint)
+            self._fit.add(datapoint)
+            self._model = self._fit.model()
+        self._async_history_changed()
+        LOGGER.debug("Persisting attributes to storage")
+        self._schedule_save()
+
+        self._pending_statistics = previous_reads
+        if self._statistics_delay() <= 0:
+            await self._async_flush_statistics()
+        else:
+            self._schedule_statistics()
+
+    def _statistics_delay(self) -> float:
+        """Seconds until the bucket of the last reading is over."""
+        last_bucket = bucket(self._history.last().timestamp)
+        return (last_bucket + 1) * GRANULAR_DELTA.total_seconds() - time.time()
+
+    @callback
+    def _schedule_statistics(self) -> None:
+        """Write the statistics of the pending bucket once it is over."""
+        if self._unsub_statistics is None:
+            self._unsub_statistics = async_call_later(
+                self.hass,
+                max(self._statistics_delay(), 0),
+                self._async_statistics_timer,
+            )
+
+    async def _async_flush_statistics(self) -> None:
+        """Write the statistics of the pending bucket, if any."""
+        if self._unsub_statistics is not None:
+            self._unsub_statistics()
+            self._unsub_statistics = None
+        if self._pending_statistics is None:
+            return
+
+        previous_reads, self._pending_statistics = self._pending_statistics, None
+        # The pending bucket is persisted until its statistics are written
+        self._schedule_save()
+        statistics_data = self._executor.async_interpolate_history(
+            self.statistics_algorithms,
+            previous_reads,
+            [self._history.last()],
+            self._statistics_chunk_size,
+        )
         LOGGER.debug(
             f"Backfilling statistics for {self.entity_id} with algorithm {self._algorithm}"
         )
-        asyncio.run_coroutine_threadsafe(
-            backfill_statistics(
-                self.hass,
-                self.unique_id,
-                self._attr_name,
-                self._attr_native_unit_of_measurement,
-                self._algorithm,
-                missing_data + [Datapoint(self._last_read_value, self._last_updated)],
-            ),
-            self.hass.loop,
-        ).result()
+        await self._backfill_statistics(statistics_data)
         LOGGER.debug(
             f"Backfilled statistics for {self.entity_id} with algorithm {self._algorithm}"
         )
+
+    async def _async_statistics_timer(self, _now: datetime) -> None:
+        self._unsub_statistics = None
+        async with self._lock:
+            await self._async_flush_statistics()
+
+    async def _async_insert_values(
+        self, datapoints: list[Datapoint], bulk: bool = False
+    ) -> None:
+        """Insert readings at their position in time, backfilling once for all.
+
+        Only the statistics of the gaps that depend on them are recomputed: the
+        gaps up to the lookback of the algorithms readings after each of them.
+        """
+        await self._async_flush_statistics()
+        for datapoint in datapoints:
+            self._history.insert(datapoint)
+        lookback = interpolate_lookback(self.statistics_algorithms)
+        # The ranges of the gaps to recompute, merged when they overlap
+        spans: list[list[int]] = []
+        for index in sorted(
+            {self._history.index(datapoint.timestamp) for datapoint in datapoints}
+        ):
+            stop = min(index + lookback + 1, len(self._history))
+            if spans and index <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], stop)
+            else:
+                spans.append([index, stop])
+        statistics_data = self._async_interpolate_spans(
+            [
+                (
+                    self._history.datapoints(max(start - lookback, 0), start),
+                    self._history.datapoints(start, stop),
+                )
+                for start, stop in spans
+            ],
+            bulk,
+        )
+        self._history.trim()
+        self._fit_model()
+        self._async_history_changed()
+
+        LOGGER.debug(
+            f"Backfilling statistics for {self.entity_id} around {len(datapoints)} inserted readings"
+        )
+        await self._backfill_statistics(statistics_data)
         LOGGER.debug("Persisting attributes to storage")
-        self._save_attributes()
+        self._schedule_save()
 
-    def reset_statistics(self) -> None:
-        """Reset the statistics for the sensor."""
-        if len(self._previous_reads) == 0:
-            LOGGER.debug("No previous reads to reset")
+    async def _async_interpolate_spans(
+        self, spans: list[tuple[list[Datapoint], list[Datapoint]]], bulk: bool
+    ) -> AsyncIterator[dict[str, Series]]:
+        """Interpolate the statistics through the old and new readings of each span."""
+        for old_datapoints, new_datapoints in spans:
+            async for chunk in self._executor.async_interpolate_history(
+                self.statistics_algorithms,
+                old_datapoints,
+                new_datapoints,
+                self._statistics_chunk_size,
+                bulk=bulk,
+            ):
+                yield chunk
+
+    async def async_import_values(self, datapoints: list[Datapoint]) -> None:
+        """Import a batch of readings, backfilling statistics and storage once.
+
+        Readings older than the last one, e.g. a paper history imported after
+        the current reading, are merged into the history.
+        """
+        async with self._lock:
+            await self._async_extend_values(datapoints)
+
+    async def _async_extend_values(self, datapoints: list[Datapoint]) -> None:
+        """Add a batch of readings, appended if they are newer than the last one."""
+        readings: dict[int, Datapoint] = {}
+        for datapoint in sorted(datapoints, key=lambda datapoint: datapoint.timestamp):
+            # Readings within the same bucket are coalesced, the later one wins
+            readings[bucket(datapoint.timestamp)] = datapoint
+        if len(readings) == 0:
+            LOGGER.debug("No readings to import")
             return
 
-        LOGGER.debug(f"Resetting statistics for {self.entity_id}")
-        reset_statistics(
-            self.hass,
-            self.unique_id,
-            self._algorithm,
+        first_timestamp = next(iter(readings.values())).timestamp
+        last_read = self._history.last()
+        if last_read is not None and last_read.timestamp >= first_timestamp:
+            await self._async_insert_values(list(readings.values()), bulk=True)
+            return
+
+        await self._async_flush_statistics()
+        statistics_data = self._executor.async_interpolate_history(
+            self.statistics_algorithms,
+            self._history.datapoints(-self._retention_reads),
+            list(readings.values()),
+            self._statistics_chunk_size,
+            bulk=True,
         )
+        self._history.extend(list(readings.values()))
+        self._fit_model()
+        self._async_history_changed()
 
-        # Backfill statistics with the previous reads
-        # and the last read value
         LOGGER.debug(
             f"Backfilling statistics for {self.entity_id} with algorithm {self._algorithm}"
         )
-        reads_seen = []
-        for read in self._previous_reads:
-            if len(reads_seen) > 0:
-                missing_data = interpolate(
-                    self._algorithm,
-                    [Datapoint.from_dict(read) for read in reads_seen],
-                    Datapoint.from_dict(read),
-                )
+        await self._backfill_statistics(statistics_data)
+        LOGGER.debug("Persisting attributes to storage")
+        self._schedule_save()
 
-                asyncio.run_coroutine_threadsafe(
-                    backfill_statistics(
-                        self.hass,
-                        self.unique_id,
-                        self._attr_name,
-                        self._attr_native_unit_of_measurement,
-                        self._algorithm,
-                        missing_data,
-                    ),
-                    self.hass.loop,
-                ).result()
-            reads_seen.append(read)
-
-        if len(reads_seen) == 0:
+    async def async_reset_statistics(self) -> None:
+        """Reset the statistics for the sensor.
+
+        The statistics are rebuilt in place rather than cleared, only the
+        hours that differ from the recorded ones are written.
+        """
+        async with self._lock:
+            await self._async_reset_statistics()
+
+    async def _async_reset_statistics(self) -> None:
+        if len(self._history) <= 1:
+            LOGGER.debug("No previous reads to reset")
             return
 
-        missing_data = interpolate(
-            self._algorithm,
-            [Datapoint.from_dict(read) for read in reads_seen],
-            Datapoint(self._last_read_value, self._last_updated),
+        # The pending bucket is rebuilt with all the others
+        if self._unsub_statistics is not None:
+            self._unsub_statistics()
+            self._unsub_statistics = None
+        self._pending_statistics = None
+
+        LOGGER.debug(f"Resetting statistics for {self.entity_id}")
+        # Rebuild the statistics through all the reads in a single pass
+        statistics_data = self._executor.async_interpolate_history(
+            self.statistics_algorithms,
+            [],
+            self._history.datapoints(),
+            self._statistics_chunk_size,
+            bulk=True,
         )
-        asyncio.run_coroutine_threadsafe(
-            backfill_statistics(
-                self.hass,
-                self.unique_id,
-                self._attr_name,
-                self._attr_native_unit_of_measurement,
-                self._algorithm,
-                missing_data + [Datapoint(self._last_read_value, self._last_updated)],
-            ),
-            self.hass.loop,
-        ).result()
+        LOGGER.debug(
+            f"Backfilling statistics for {self.entity_id} with algorithm {self._algorithm}"
+        )
+        await self._backfill_statistics(statistics_data)
 
     @property
     def extra_state_attributes(self) -> dict[str, any]:
-        """Return the state attributes."""
+        """Return the state attributes, serialized once per change of the history."""
+        if self._attributes is None:
+            self._attributes = (
+                self._summary_attributes()
+                if self._summary_attributes_only
+                else self._full_attributes()
+            )
+        return self._attributes
+
+    def _full_attributes(self) -> dict[str, any]:
+        last_read = self._history.last()
         return {
             "meter_name": self._attr_name,
-            "last_updated": self._last_updated,
-            "last_read": self._last_read_value,
-            "previous_reads": json.dumps(self._previous_reads),
+            "last_updated": last_read.timestamp if last_read else None,
+            "last_read": last_read.value if last_read else None,
+            "previous_reads": json.dumps(
+                self._history.as_list(-self._retention_reads)[:-1]
+            ),
             "algorithm": self._algorithm,
         }
 
+    def _summary_attributes(self) -> dict[str, any]:
+        """Fixed-size summary of the history, instead of the previous reads."""
+        first_read = self._history.datapoints(0, 1)
+        last_read = self._history.last()
+        return {
+            "meter_name": self._attr_name,
+            "reads": len(self._history),
+            "first_updated": first_read[0].timestamp if first_read else None,
+            "first_read": first_read[0].value if first_read else None,
+            "last_updated": last_read.timestamp if last_read else None,
+            "last_read": last_read.value if last_read else None,
+            # Per GRANULAR_DELTA, as the statistics
+            "slope": (
+                self._model.slope * GRANULAR_DELTA.total_seconds()
+                if self._model
+                else None
+            ),
+            "algorithm": self._algorithm,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Register the sensor to be refreshed by the coordinator."""
+        await super().async_added_to_hass()
+        coordinator = self.hass.data.get(DOMAIN)[DATA_COORDINATOR]
+        coordinator.meters[self.entity_id] = self
+        self.async_on_remove(lambda: coordinator.meters.pop(self.entity_id, None))
+        if self._pending_statistics is not None:
+            # Restored from storage, e.g. Home Assistant stopped within the bucket
+            self._schedule_statistics()
+
+    def evaluate(self, now: float) -> float | None:
+        """Return the extrapolated value of the meter at now (in epoch seconds)."""
+        with self.perf.measure("evaluate"):
+            if self._model is None:
+                return None
+            return self._model.evaluate(now)
+
+    @callback
+    def async_write_value(self, value: float | None) -> None:
+        """Update the state of the sensor to the value."""
+        with self.perf.measure("write_state"):
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+    def evaluate_at(self, timestamps: list[float]) -> list[float | None]:
+        """Return the values of the meter at the timestamps (in epoch seconds).
+
+        The readings are interpolated linearly, and extrapolated past the last
+        one as the state is.
+        """
+        if self._segments is None:
+            self._segments = self._history.segments(self._model)
+        return self._segments.evaluate(timestamps)
+
+    @callback
+    def _async_history_changed(self) -> None:
+        """Invalidate the cached attributes and segments and write the new state."""
+        self._attributes = None
+        self._segments = None
+        self.async_write_value(self.evaluate(time.time()))
+
+    def _fit_model(self) -> None:
+        """Refit the extrapolation model from scratch over the history."""
+        self._fit = incremental_fit(self._algorithm, self._retention_reads)
+        for datapoint in self._history.datapoints(-self._retention_reads):
+            self._fit.add(datapoint)
+        self._model = self._fit.model()
+
     @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        latest_datapoint = extrapolate(
-            self._algorithm,
-            [Datapoint.from_dict(read) for read in self._previous_reads]
-            + [Datapoint(self._last_read_value, self._last_updated)],
-            datetime.now(timezone.utc),
-        )
-        if latest_datapoint:
-            return latest_datapoint.value
-        return None
-
-    def _save_attributes(self) -> None:
-        attributes = self.extra_state_attributes
-        asyncio.run_coroutine_threadsafe(
-            self._store.async_save(attributes),
-            self.hass.loop,
-        ).result()
-        LOGGER.debug("Saved attributes to storage")
-
-    async def _load_attributes(self) -> None:
-        attributes = await self._store.async_load()
+    def algorithm(self) -> str:
+        """The algorithm the meter is extrapolated with."""
+        return self._algorithm
+
+    @property
+    def statistics_algorithms(self) -> list[str]:
+        """The algorithm of the meter, then the other algorithms with statistics."""
+        return [self._algorithm] + [
+            algorithm
+            for algorithm in self._extra_algorithms
+            if algorithm != self._algorithm
+        ]
+
+    @property
+    def reading_count(self) -> int:
+        """The number of readings in the history of the meter."""
+        return len(self._history)
+
+    async def async_export_chunks(self, kind: str) -> AsyncIterator[dict[str, Series]]:
+        """Stream the readings or the hourly series, in aligned chunks by column.
+
+        The hourly series are interpolated through all the readings, as the
+        statistics are, chunk by chunk so that they are never fully in memory.
+        """
+        datapoints = self._history.datapoints()
+        if kind == EXPORT_READINGS:
+            for chunk in Series.from_datapoints(datapoints).chunks(
+                self._statistics_chunk_size
+            ):
+                yield {EXPORT_VALUE_COLUMN: chunk}
+            return
+
+        async for chunk in self._executor.async_interpolate_history(
+            self.statistics_algorithms, [], datapoints, self._statistics_chunk_size
+        ):
+            yield chunk
+
+    async def _backfill_statistics(
+        self, statistics_data: AsyncIterable[dict[str, Series]]
+    ) -> None:
+        """Stream the chunks of the series of all the algorithms to the recorder."""
+        statistics = await async_import_module(self.hass, STATISTICS_MODULE)
+        with self.perf.measure("backfill_statistics") as counter:
+            counter.rows += await statistics.backfill_algorithms_statistics(
+                self.hass,
+                self.unique_id,
+                self._attr_name,
+                self._attr_native_unit_of_measurement,
+                self.perf.measure_aiter(
+                    "interpolate",
+                    statistics_data,
+                    lambda chunk: sum(len(series) for series in chunk.values()),
+                ),
+            )
+
+    async def async_flush(self) -> None:
+        """Write pending statistics and changes to storage right away."""
+        if self._worker is not None:
+            await self._worker
+        async with self._lock:
+            await self._async_flush_statistics()
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+            LOGGER.debug("Flushed attributes to storage")
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Mark the sensor dirty, coalescing the writes within the save delay."""
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, self._save_delay)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        with self.perf.measure("store_save") as counter:
+            self._save_pending = False
+            counter.rows += len(self._history)
+            data = {
+                "algorithm": self._algorithm,
+                "reads": self._history.as_list(),
+            }
+            if self._model is not None:
+                # Restored at startup instead of refitting the history
+                data["model"] = {**asdict(self._model), "window": self._retention_reads}
+            if self._pending_statistics is not None:
+                # Restored at startup, so that the statistics are not lost
+                data["pending_statistics"] = [
+                    datapoint.as_dict() for datapoint in self._pending_statistics
+                ]
+            return data
+
+    async def _load_attributes(self, loader: MeterStoreLoader | None = None) -> None:
+        """Restore the readings and the model, as preloaded by the loader if any."""
+        with self.perf.measure("load") as counter:
+            if loader is not None:
+                attributes = await loader.async_load(self._store)
+            else:
+                attributes = await self._store.async_load()
+            if attributes:
+                counter.rows += len(attributes.get("reads", ()))
+            self._restore_attributes(attributes)
+
+    def _restore_attributes(self, attributes: dict | None) -> None:
         if attributes:
             LOGGER.debug("Loaded attributes from storage")
-            self._last_updated = datetime.fromisoformat(attributes.get("last_updated"))
-            self._last_read_value = attributes.get("last_read")
-            self._previous_reads = json.loads(attributes.get("previous_reads"))
+            if "reads" in attributes:
+                reads = attributes["reads"]
+            else:
+                # Legacy format, the previous reads were stored as a JSON string
+                reads = json.loads(attributes.get("previous_reads")) + [
+                    {
+                        "value": attributes.get("last_read"),
+                        "timestamp": attributes.get("last_updated"),
+                    }
+                ]
+            self._history = ReadingHistory.from_list(
+                reads, self._retention_reads, self._retention_tiers, GRANULAR_DELTA
+            )
             self._algorithm = attributes.get("algorithm")
+            model = attributes.get("model")
+            if model is not None and model.get("window") == self._retention_reads:
+                self._model = Model(model["value"], model["timestamp"], model["slope"])
+                self._fit = None
+            else:
+                self._fit_model()
+            pending_statistics = attributes.get("pending_statistics")
+            if pending_statistics is not None:
+                self._pending_statistics = [
+                    Datapoint.from_dict(read) for read in pending_statistics
+                ]
+            self._attributes = None
+            self._segments = None
+            self._attr_native_value = self.evaluate(time.time())
         else:
             LOGGER.debug("No attributes found in storage")
+
+
+class MeterPerfSensor(CoordinatorEntity[MeterRefreshCoordinator], SensorEntity):
+    """Diagnostic sensor with the max latency of an operation of a meter.
+
+    The other counters of the operation are exposed as attributes.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: MeterRefreshCoordinator,
+        meter: UtilityManualTrackingSensor,
+        operation: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{meter.unique_id}_{operation}"
+        self._attr_name = f"{meter.name} {operation.replace('_', ' ')}"
+        self.entity_id = f"sensor.{self._attr_unique_id}"
+        self._counter = meter.perf.counters[operation]
+
+    @property
+    def native_value(self) -> float:
+        """Return the max latency of the operation."""
+        return self._counter.max * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, any]:
+        """Return the counters of the operation."""
+        return {
+            "calls": self._counter.calls,
+            "total_ms": self._counter.total * 1000,
+            "mean_ms": self._counter.mean * 1000,
+            "rows": self._counter.rows,
+        }
@@ -1,12 +1,25 @@
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from datetime import datetime, timezone
+
+from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.models import StatisticMetaData, StatisticData
 from homeassistant.components.recorder.statistics import (
     async_add_external_statistics,
-    clear_statistics,
+    statistics_during_period,
 )
 from homeassistant.core import HomeAssistant
 
-from custom_components.utility_manual_tracking.consts import DOMAIN, LOGGER
-from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.consts import (
+    DEFAULT_STATISTICS_CHUNK_SIZE,
+    DOMAIN,
+    LOGGER,
+)
+from custom_components.utility_manual_tracking.fitter import GRANULAR_DELTA, Series
+
+# Pending recorder tasks above which the backfill waits before the next chunk
+MAX_RECORDER_BACKLOG = 100
+RECORDER_BACKLOG_WAIT = 0.1
 
 
 async def backfill_statistics(
@@ -15,43 +28,166 @@ async def backfill_statistics(
     meter_name: str,
     meter_unit: str,
     algorithm: str,
-    datapoints: list[Datapoint],
-) -> None:
-    statistics_id: str = get_statistics_id(sensor_id, algorithm)
-    metadata = StatisticMetaData(
-        has_mean=False,
-        has_sum=True,
-        name=f"{meter_name} - statistics ({algorithm})",
-        source=DOMAIN,
-        statistic_id=statistics_id,
-        unit_of_measurement=meter_unit,
+    series: Series | Iterable[Series] | AsyncIterable[Series],
+    chunk_size: int = DEFAULT_STATISTICS_CHUNK_SIZE,
+) -> int:
+    """Write the series to the recorder, streamed in chunks of chunk_size rows.
+
+    The series can be given as a (lazy) stream of chunks, so that only one
+    chunk is in memory at a time; an asynchronous stream is expected to be
+    chunked already. Returns the number of rows written.
+    """
+    if isinstance(series, Series):
+        series = [series]
+    if not isinstance(series, AsyncIterable):
+        series = _async_iterate(Series.batched(series, chunk_size))
+    return await backfill_algorithms_statistics(
+        hass,
+        sensor_id,
+        meter_name,
+        meter_unit,
+        _async_by_algorithm(algorithm, series),
     )
 
-    statistics: list[StatisticData] = []
-    for datapoint in datapoints:
-        start_timestamp = datapoint.timestamp.replace(minute=0, second=0, microsecond=0)
-        statistics.append(
-            StatisticData(
-                sum=datapoint.value,
-                start=start_timestamp,
-            )
+
+async def backfill_algorithms_statistics(
+    hass: HomeAssistant,
+    sensor_id: str,
+    meter_name: str,
+    meter_unit: str,
+    chunks: AsyncIterable[dict[str, Series]],
+) -> int:
+    """Write the series of several algorithms to the recorder, chunk by chunk.
+
+    Each chunk maps the algorithms to their series, all covering the same
+    hours. Only the last row of each hour is written, as the recorder keeps
+    the last one. The recorded sums are read back once per chunk for all the
+    algorithms, and rows whose sum is already recorded are skipped, so that
+    replaying or rebuilding statistics only writes the hours that actually
+    changed. The changed rows are written as one batch per algorithm.
+
+    Between chunks, the event loop is yielded to and the backfill waits for
+    the recorder to work through its backlog. Returns the number of rows
+    written.
+    """
+    recorder = get_instance(hass)
+    step = GRANULAR_DELTA.total_seconds()
+    metadata: dict[str, StatisticMetaData] = {}
+    rows = 0
+    rows_changed = 0
+    async for chunk in _async_hourly(chunks):
+        if rows > 0:
+            await asyncio.sleep(0)
+            while recorder.backlog > MAX_RECORDER_BACKLOG:
+                await asyncio.sleep(RECORDER_BACKLOG_WAIT)
+
+        statistics_ids = {
+            algorithm: get_statistics_id(sensor_id, algorithm) for algorithm in chunk
+        }
+        starts = next(iter(chunk.values())).keys()
+        existing_sums = await _async_get_sums(
+            hass, set(statistics_ids.values()), min(starts), max(starts) + step
         )
+        for algorithm, hourly_sums in chunk.items():
+            statistics_id = statistics_ids[algorithm]
+            sums = existing_sums.get(statistics_id, {})
+            statistics: list[StatisticData] = [
+                StatisticData(
+                    sum=value, start=datetime.fromtimestamp(start, timezone.utc)
+                )
+                for start, value in hourly_sums.items()
+                if sums.get(start) != value
+            ]
+            rows += len(hourly_sums)
+            if len(statistics) == 0:
+                continue
+
+            if algorithm not in metadata:
+                metadata[algorithm] = StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{meter_name} - statistics ({algorithm})",
+                    source=DOMAIN,
+                    statistic_id=statistics_id,
+                    unit_of_measurement=meter_unit,
+                )
+            LOGGER.debug(
+                f"Writing statistics {statistics_id}: {len(statistics)} of {len(hourly_sums)} datapoints changed"
+            )
+            async_add_external_statistics(hass, metadata[algorithm], statistics)
+            rows_changed += len(statistics)
 
-    LOGGER.debug(f"Writing statistics {statistics_id}: {len(statistics)} datapoints")
-    async_add_external_statistics(hass, metadata, statistics)
+    LOGGER.debug(
+        f"Wrote statistics of {sensor_id}: {rows_changed} of {rows} datapoints changed"
+    )
+    return rows_changed
+
+
+async def _async_hourly(
+    chunks: AsyncIterable[dict[str, Series]],
+) -> AsyncIterator[dict[str, dict[float, float]]]:
+    """Regroup the chunks into the sum of each hour, by algorithm.
+
+    A reading off the hour shares its hour with the row interpolated before
+    it; the recorder keeps the last row written, so only the last row of each
+    hour is kept. The last hour of a chunk is held back until the next chunk,
+    which may continue it.
+    """
+    step = GRANULAR_DELTA.total_seconds()
+    held: dict[str, dict[float, float]] = {}
+    async for chunk in chunks:
+        hourly: dict[str, dict[float, float]] = {}
+        for algorithm, series in chunk.items():
+            sums = held.get(algorithm, {})
+            for timestamp, value in zip(series.timestamps, series.values):
+                sums[timestamp - timestamp % step] = value
+            hourly[algorithm] = sums
+        last_start = next(reversed(next(iter(hourly.values()))))
+        held = {
+            algorithm: {last_start: sums.pop(last_start)}
+            for algorithm, sums in hourly.items()
+        }
+        if len(next(iter(hourly.values()))) > 0:
+            yield hourly
+    if held:
+        yield held
+
+
+async def _async_iterate(chunks: Iterable[Series]) -> AsyncIterator[Series]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def _async_by_algorithm(
+    algorithm: str, chunks: AsyncIterable[Series]
+) -> AsyncIterator[dict[str, Series]]:
+    async for chunk in chunks:
+        yield {algorithm: chunk}
+
+
+async def _async_get_sums(
+    hass: HomeAssistant, statistics_ids: set[str], start: float, end: float
+) -> dict[str, dict[float, float]]:
+    """Read back the hourly sums already recorded between start and end."""
+    recorder = get_instance(hass)
+    # The statistics still queued in the recorder would not be read back
+    await recorder.async_block_till_done()
+    statistics = await recorder.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        datetime.fromtimestamp(start, timezone.utc),
+        datetime.fromtimestamp(end, timezone.utc),
+        statistics_ids,
+        "hour",
+        None,
+        {"sum"},
+    )
+    return {
+        statistics_id: {row["start"]: row["sum"] for row in rows}
+        for statistics_id, rows in statistics.items()
+    }
 
 
 def get_statistics_id(sensor_id: str, algorithm: str) -> str:
     """Get the statistics ID for a sensor."""
     return f"{DOMAIN}:{sensor_id}_statistics_{algorithm}"
-
-
-def reset_statistics(
-    hass: HomeAssistant,
-    sensor_id: str,
-    algorithm: str,
-) -> None:
-    """Clear statistics for a sensor."""
-    statistics_id = get_statistics_id(sensor_id, algorithm)
-    LOGGER.debug(f"Clearing statistics {statistics_id}")
-    clear_statistics(hass, statistics_id)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from homeassistant.exceptions import ServiceValidationError
+import pytest
+
+from custom_components.utility_manual_tracking.action import (
+    MAX_METER_VALUES,
+    _add_readings,
+    _get_dates,
+)
+
+
+def test_get_dates_range():
+    """Test the listed dates come first, then the range from start to end."""
+    dates = _get_dates(
+        {
+            "dates": ["2023-10-05 12"],
+            "start": "2023-10-01 00",
+            "end": "2023-10-01 06",
+            "step": 3,
+        }
+    )
+
+    assert len(dates) == 4
+    assert [date - dates[1] for date in dates[1:]] == [
+        timedelta(0),
+        timedelta(hours=3),
+        timedelta(hours=6),
+    ]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"dates": ["2023-10-01"]},
+        {"start": "yesterday"},
+        {"start": "2023-10-01 00", "step": "hourly"},
+        {"start": "2023-10-01 00", "step": 0},
+        {"start": "2023-10-01 00", "end": "2023-10-03 00", "step": 1 / 3600},
+        {"dates": ["2023-10-01 00"] * (MAX_METER_VALUES + 1)},
+    ],
+)
+def test_get_dates_invalid(data):
+    """Test invalid dates are reported as validation errors of the call."""
+    with pytest.raises(ServiceValidationError):
+        _get_dates(data)
+
+
+def test_add_readings_by_entity():
+    """Test the readings are grouped by their entity, if any."""
+    readings = {}
+    _add_readings(readings, [{"value": "1.5", "date": "2023-10-01 00"}])
+    _add_readings(readings, {"sensor.water": [{"value": 2, "date": "2023-10-01 01"}]})
+
+    assert [datapoint.value for datapoint in readings[None]] == [1.5]
+    assert [datapoint.value for datapoint in readings["sensor.water"]] == [2]
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"date": "2023-10-01 00"},
+        {"value": "lots", "date": "2023-10-01 00"},
+        {"value": 1, "date": "2023-10-01"},
+    ],
+)
+def test_add_readings_invalid(row):
+    """Test invalid readings are reported as validation errors of the call."""
+    with pytest.raises(ServiceValidationError):
+        _add_readings({}, [row])
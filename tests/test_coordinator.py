@@ -0,0 +1,71 @@
+import asyncio
+from datetime import timedelta
+
+from benchmarks.fakes import FakeHass, FakeRecorder, create_sensor, fake_home_assistant
+from custom_components.utility_manual_tracking.consts import DATA_COORDINATOR, DOMAIN
+from custom_components.utility_manual_tracking.coordinator import (
+    MeterRefreshCoordinator,
+)
+
+
+class FakeMeter:
+    """Meter with a fixed value, recording the states written."""
+
+    def __init__(self, value: float | None) -> None:
+        self.value = value
+        self.states: list[float | None] = []
+
+    def evaluate(self, now: float) -> float | None:
+        return self.value
+
+    def async_write_value(self, value: float | None) -> None:
+        self.states.append(value)
+
+
+def test_coordinator_writes_states():
+    """Test the values of all the meters are computed, then written."""
+    water, gas, power = FakeMeter(1.5), FakeMeter(None), FakeMeter(3)
+
+    async def run():
+        coordinator = MeterRefreshCoordinator(
+            FakeHass(asyncio.get_running_loop()), timedelta(hours=1)
+        )
+        coordinator.meters["sensor.water"] = water
+        coordinator.meters["sensor.gas"] = gas
+        coordinator.data = await coordinator._async_update_data()
+        coordinator._async_write_states()
+
+        # A meter added since the update is written on the next one
+        coordinator.meters["sensor.power"] = power
+        coordinator._async_write_states()
+        return coordinator.data
+
+    data = asyncio.run(run())
+
+    assert data == {"sensor.water": 1.5, "sensor.gas": None}
+    assert water.states == [1.5, 1.5]
+    assert gas.states == [None, None]
+    assert power.states == []
+
+
+def test_coordinator_registers_meters():
+    """Test the meters register while they are added, until they are removed."""
+    removers = []
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        coordinator = MeterRefreshCoordinator(hass, timedelta(hours=1))
+        hass.data[DOMAIN][DATA_COORDINATOR] = coordinator
+        sensor = create_sensor(hass)
+        sensor.async_on_remove = removers.append
+        await sensor.async_added_to_hass()
+        registered = dict(coordinator.meters)
+        for remove in removers:
+            remove()
+        return sensor, registered, coordinator.meters
+
+    with fake_home_assistant(FakeRecorder()):
+        sensor, registered, meters = asyncio.run(run())
+
+    assert registered == {sensor.entity_id: sensor}
+    assert meters == {}
@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fakes import FakeHass
+from custom_components.utility_manual_tracking.algorithms import interpolate_history
+from custom_components.utility_manual_tracking.executor import (
+    EXECUTION_MODES,
+    FitterExecutor,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint, Series
+
+OLD_DATAPOINTS = [
+    Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+]
+NEW_DATAPOINTS = [
+    Datapoint(3.3, datetime(2023, 10, 1, 2, 20, tzinfo=timezone.utc)),
+    Datapoint(123.4, datetime(2023, 10, 8, 3, 0, tzinfo=timezone.utc)),
+]
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+@pytest.mark.parametrize("mode", EXECUTION_MODES)
+def test_executor_interpolate_history(mode, bulk):
+    """Test every execution mode streams the same chunks of the series."""
+    algorithms = ["linear", "regression"]
+
+    async def collect() -> list[dict[str, Series]]:
+        executor = FitterExecutor(FakeHass(asyncio.get_running_loop()), mode)
+        try:
+            return [
+                chunk
+                async for chunk in executor.async_interpolate_history(
+                    algorithms, OLD_DATAPOINTS, NEW_DATAPOINTS, 7, bulk
+                )
+            ]
+        finally:
+            executor.shutdown()
+
+    chunks = asyncio.run(collect())
+
+    for algorithm in algorithms:
+        algorithm_chunks = [chunk[algorithm] for chunk in chunks]
+        assert all(len(chunk) == 7 for chunk in algorithm_chunks[:-1])
+        assert Series.concat(algorithm_chunks) == interpolate_history(
+            algorithm, OLD_DATAPOINTS, NEW_DATAPOINTS
+        )
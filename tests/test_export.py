@@ -0,0 +1,53 @@
+import csv
+from datetime import datetime, timezone
+import io
+import json
+
+from custom_components.utility_manual_tracking.algorithms import (
+    interpolate_algorithms_chunks,
+    interpolate_history,
+)
+from custom_components.utility_manual_tracking.export import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_NDJSON,
+    format_chunk,
+    format_header,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint
+
+DATAPOINTS = [
+    Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+    Datapoint(3.3, datetime(2023, 10, 1, 2, 20, tzinfo=timezone.utc)),
+    Datapoint(10, datetime(2023, 10, 2, 3, 0, tzinfo=timezone.utc)),
+]
+
+
+def test_export_csv():
+    """Test the chunks of the series are exported as CSV rows."""
+    columns = ["linear", "regression"]
+    export = format_header(columns, EXPORT_FORMAT_CSV) + "".join(
+        format_chunk(columns, chunk, EXPORT_FORMAT_CSV)
+        for chunk in interpolate_algorithms_chunks(columns, [], DATAPOINTS, 5)
+    )
+
+    rows = list(csv.reader(io.StringIO(export)))
+    series = interpolate_history("linear", [], DATAPOINTS)
+    assert rows[0] == ["timestamp", "linear", "regression"]
+    assert len(rows) == len(series) + 1
+    assert rows[1][0] == "2023-10-01T00:00:00+00:00"
+    assert [float(row[1]) for row in rows[1:]] == series.values
+
+
+def test_export_ndjson():
+    """Test the chunks of the series are exported as NDJSON rows."""
+    columns = ["linear"]
+    assert format_header(columns, EXPORT_FORMAT_NDJSON) == ""
+    export = "".join(
+        format_chunk(columns, chunk, EXPORT_FORMAT_NDJSON)
+        for chunk in interpolate_algorithms_chunks(columns, [], DATAPOINTS, 5)
+    )
+
+    rows = [json.loads(line) for line in export.splitlines()]
+    series = interpolate_history("linear", [], DATAPOINTS)
+    assert rows[-1] == {"timestamp": "2023-10-02T03:00:00+00:00", "linear": 10}
+    assert [row["linear"] for row in rows] == series.values
@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta, timezone
+
+from custom_components.utility_manual_tracking.fitter import Datapoint, Model
+from custom_components.utility_manual_tracking.history import ReadingHistory, Tier
+
+
+def test_history_append():
+    """Test appending readings to the history."""
+    history = ReadingHistory()
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)))
+    history.append(Datapoint(2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)))
+
+    assert len(history) == 2
+    assert history.last() == Datapoint(
+        2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)
+    )
+
+
+def test_history_empty():
+    """Test an empty history."""
+    history = ReadingHistory()
+
+    assert len(history) == 0
+    assert history.last() is None
+    assert history.datapoints() == []
+
+
+def test_history_evicts_oldest():
+    """Test the history evicts the oldest readings beyond maxlen."""
+    history = ReadingHistory(maxlen=2)
+    for hour in range(4):
+        history.append(
+            Datapoint(hour, datetime(2023, 10, 1, hour, 0, tzinfo=timezone.utc))
+        )
+
+    assert history.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 3, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_downsamples_through_tiers():
+    """Test older readings are downsampled, keeping the latest per bucket."""
+    history = ReadingHistory(
+        maxlen=2,
+        tiers=[Tier(timedelta(days=1), 2), Tier(timedelta(days=7), 1)],
+    )
+    start = datetime(2023, 10, 2, 0, 0, tzinfo=timezone.utc)
+    # 4 readings a day over 3 weeks
+    for i in range(4 * 21):
+        history.append(Datapoint(i, start + timedelta(hours=6 * i)))
+
+    assert [datapoint.value for datapoint in history.datapoints()] == [
+        # Weekly tier: the latest reading older than the daily tier
+        75,
+        # Daily tier: the latest readings of the 2 days before the latest ones
+        79,
+        81,
+        # The 2 latest readings, at full resolution
+        82,
+        83,
+    ]
+
+
+def test_history_extend_downsamples_once():
+    """Test extending the history downsamples the same way as appending."""
+    tiers = [Tier(timedelta(days=1), 5)]
+    start = datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)
+    datapoints = [Datapoint(i, start + timedelta(hours=5 * i)) for i in range(100)]
+    appended = ReadingHistory(maxlen=3, tiers=tiers)
+    for datapoint in datapoints:
+        appended.append(datapoint)
+    extended = ReadingHistory(maxlen=3, tiers=tiers)
+    extended.extend(datapoints)
+
+    assert extended.datapoints() == appended.datapoints()
+
+
+def test_history_insert():
+    """Test inserting readings at their position in time."""
+    history = ReadingHistory()
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)))
+    history.append(Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)))
+
+    index = history.insert(
+        Datapoint(2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc))
+    )
+
+    assert index == 1
+    assert history.datapoints() == [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+        Datapoint(2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_insert_replaces_same_timestamp():
+    """Test inserting a reading with an existing timestamp replaces it."""
+    history = ReadingHistory()
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)))
+    history.append(Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)))
+
+    index = history.insert(
+        Datapoint(2, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc))
+    )
+
+    assert index == 0
+    assert history.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_serializable():
+    """Test if the history is serializable."""
+    history = ReadingHistory()
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)))
+
+    assert history.as_list() == [{"value": 1, "timestamp": "2023-10-01T00:00:00+00:00"}]
+
+
+def test_history_deserializable():
+    """Test if the history is deserializable."""
+    history = ReadingHistory.from_list(
+        [
+            {"value": 1, "timestamp": "2023-10-01T00:00:00+00:00"},
+            {"value": 2, "timestamp": "2023-10-01T01:00:00+00:00"},
+            {"value": 3, "timestamp": "2023-10-01T02:00:00+00:00"},
+        ],
+        maxlen=2,
+    )
+
+    assert history.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_coalesces_same_bucket():
+    """Test readings within the same bucket are coalesced, the latest wins."""
+    history = ReadingHistory(resolution=timedelta(hours=1))
+
+    assert not history.append(
+        Datapoint(1, datetime(2023, 10, 1, 0, 10, tzinfo=timezone.utc))
+    )
+    assert history.append(
+        Datapoint(2, datetime(2023, 10, 1, 0, 50, tzinfo=timezone.utc))
+    )
+    history.extend(
+        [
+            Datapoint(3, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)),
+            Datapoint(4, datetime(2023, 10, 1, 1, 30, tzinfo=timezone.utc)),
+        ]
+    )
+
+    assert history.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 0, 50, tzinfo=timezone.utc)),
+        Datapoint(4, datetime(2023, 10, 1, 1, 30, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_insert_coalesces_same_bucket():
+    """Test inserting a reading within the bucket of an existing one."""
+    history = ReadingHistory(resolution=timedelta(hours=1))
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 10, tzinfo=timezone.utc)))
+    history.append(Datapoint(3, datetime(2023, 10, 1, 2, 30, tzinfo=timezone.utc)))
+
+    # Later than the reading of its bucket, replaces it
+    assert (
+        history.insert(Datapoint(2, datetime(2023, 10, 1, 0, 20, tzinfo=timezone.utc)))
+        == 0
+    )
+    # Earlier than the reading of its bucket, dropped
+    assert (
+        history.insert(Datapoint(5, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)))
+        == 1
+    )
+
+    assert history.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 0, 20, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 2, 30, tzinfo=timezone.utc)),
+    ]
+
+
+def test_history_segments():
+    """Test evaluating the readings in batch through the segment index."""
+    history = ReadingHistory()
+    history.append(Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)))
+    history.append(Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)))
+    history.append(Datapoint(4, datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc)))
+    model = Model(4, datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc).timestamp(), 1)
+
+    segments = history.segments(model)
+
+    assert segments.evaluate(
+        [
+            datetime(2023, 9, 30, 23, 0, tzinfo=timezone.utc).timestamp(),
+            datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc).timestamp(),
+            datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc).timestamp(),
+            datetime(2023, 10, 1, 4, 0, tzinfo=timezone.utc).timestamp(),
+            datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc).timestamp(),
+            datetime(2023, 10, 1, 6, 1, tzinfo=timezone.utc).timestamp(),
+        ]
+    ) == [None, 1, 2, 3.5, 4, 64]
@@ -1,10 +1,18 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
+import pytest
+
+from custom_components.utility_manual_tracking import linear_fitter
 from custom_components.utility_manual_tracking.algorithms import (
+    ALGORITHMS,
     extrapolate,
     interpolate,
+    interpolate_history,
+    interpolate_history_chunks,
+    interpolate_lookback,
+    interpolate_series,
 )
-from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.fitter import Datapoint, Series
 
 
 def test_linear_interpolate_normal():
@@ -36,6 +44,99 @@ def test_linear_interpolate_no_old_datapoints():
     assert len(missing_datapoints) == 0
 
 
+@pytest.mark.parametrize("vectorized", [True, False])
+@pytest.mark.parametrize(
+    "new_datapoint",
+    [
+        Datapoint(2.5, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)),
+        Datapoint(7.3, datetime(2023, 10, 1, 4, 0, tzinfo=timezone.utc)),
+        Datapoint(9.1, datetime(2023, 10, 1, 4, 25, 13, tzinfo=timezone.utc)),
+        Datapoint(1234.567, datetime(2024, 4, 1, 17, 0, tzinfo=timezone.utc)),
+    ],
+)
+def test_linear_interpolate_series_matches_interpolate(
+    monkeypatch, vectorized, new_datapoint
+):
+    """Test the interpolated series is exactly the interpolated datapoints."""
+    if not vectorized:
+        monkeypatch.setattr(linear_fitter, "np", None)
+    elif linear_fitter.np is None:
+        pytest.skip("numpy is not installed")
+
+    old_datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+        Datapoint(2.2, datetime(2023, 10, 1, 0, 40, 7, tzinfo=timezone.utc)),
+    ]
+
+    series = interpolate_series("linear", old_datapoints, new_datapoint)
+
+    assert series == Series.from_datapoints(
+        interpolate("linear", old_datapoints, new_datapoint)
+    )
+
+
+def test_linear_interpolate_series_no_old_datapoints():
+    """Test linear series interpolation with no old datapoints."""
+    new_datapoint = Datapoint(5, datetime(2023, 10, 1, 4, 0, tzinfo=timezone.utc))
+
+    series = interpolate_series("linear", [], new_datapoint)
+
+    assert len(series) == 0
+
+
+def test_linear_interpolate_history():
+    """Test linear interpolation through a history of datapoints."""
+    old_datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+    ]
+    new_datapoints = [
+        Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+        Datapoint(4, datetime(2023, 10, 1, 3, 0, tzinfo=timezone.utc)),
+        Datapoint(7, datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc)),
+    ]
+
+    series = interpolate_history("linear", old_datapoints, new_datapoints)
+
+    assert series.datapoints() == [
+        Datapoint(2, datetime(2023, 10, 1, 1, 0, tzinfo=timezone.utc)),
+        Datapoint(3, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+        Datapoint(4, datetime(2023, 10, 1, 3, 0, tzinfo=timezone.utc)),
+        Datapoint(5, datetime(2023, 10, 1, 4, 0, tzinfo=timezone.utc)),
+        Datapoint(6, datetime(2023, 10, 1, 5, 0, tzinfo=timezone.utc)),
+        Datapoint(7, datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc)),
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_linear_interpolate_history_chunks(monkeypatch, vectorized, size):
+    """Test the chunks streamed through a history add up to the full series."""
+    if not vectorized:
+        monkeypatch.setattr(linear_fitter, "np", None)
+    elif linear_fitter.np is None:
+        pytest.skip("numpy is not installed")
+
+    old_datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+    ]
+    new_datapoints = [
+        Datapoint(3.3, datetime(2023, 10, 1, 2, 20, tzinfo=timezone.utc)),
+        Datapoint(123.4, datetime(2023, 10, 8, 3, 0, tzinfo=timezone.utc)),
+    ]
+
+    chunks = list(
+        Series.batched(
+            interpolate_history_chunks("linear", old_datapoints, new_datapoints, size),
+            size,
+        )
+    )
+
+    assert all(len(chunk) == size for chunk in chunks[:-1])
+    assert Series.concat(chunks) == interpolate_history(
+        "linear", old_datapoints, new_datapoints
+    )
+
+
 def test_linear_extrapolate_normal():
     """Test linear extrapolation."""
 
@@ -71,4 +172,49 @@ def test_linear_extrapolate_one_datapoint():
     extrapolated_datapoint = extrapolate("linear", datapoints, now)
 
     assert extrapolated_datapoint.value == 1
-    assert extrapolated_datapoint.timestamp == now
\ No newline at end of file
+    assert extrapolated_datapoint.timestamp == now
+
+
+def test_linear_fit_matches_extrapolate():
+    """Test the fitted linear model evaluates to the extrapolated value."""
+    datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0)),
+        Datapoint(2, datetime(2023, 10, 1, 1, 0)),
+    ]
+    now = datetime(2023, 10, 1, 4, 0)
+
+    model = ALGORITHMS["linear"].extrapolate.fit(datapoints)
+    extrapolated_datapoint = extrapolate("linear", datapoints, now)
+
+    assert model.evaluate(now.timestamp()) == extrapolated_datapoint.value
+
+
+def test_linear_fit_no_datapoints():
+    """Test linear fit with no datapoints."""
+    assert ALGORITHMS["linear"].extrapolate.fit([]) is None
+
+
+def test_linear_fit_one_datapoint():
+    """Test linear fit with one datapoint."""
+    datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0)),
+    ]
+    now = datetime(2023, 10, 1, 4, 0)
+
+    model = ALGORITHMS["linear"].extrapolate.fit(datapoints)
+
+    assert model.evaluate(now.timestamp()) == 1
+
+
+def test_linear_interpolate_lookback():
+    """Test the gaps only depend on the latest old datapoint."""
+    old_datapoints = [
+        Datapoint(1, datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)),
+        Datapoint(5, datetime(2023, 10, 1, 2, 0, tzinfo=timezone.utc)),
+    ]
+    new_datapoint = Datapoint(7, datetime(2023, 10, 1, 6, 0, tzinfo=timezone.utc))
+
+    assert interpolate_lookback(["linear"]) == 1
+    assert interpolate_series(
+        "linear", old_datapoints[-1:], new_datapoint
+    ) == interpolate_series("linear", old_datapoints, new_datapoint)
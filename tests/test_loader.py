@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import FakeHass, FakeRecorder, fake_home_assistant
+from custom_components.utility_manual_tracking.consts import (
+    CONF_METER_CLASS,
+    CONF_METER_NAME,
+)
+from custom_components.utility_manual_tracking.loader import (
+    MeterStoreLoader,
+    create_store,
+    meter_unique_id,
+)
+
+
+@pytest.fixture(autouse=True)
+def fake_storage():
+    """In-memory storage for the meters."""
+    with fake_home_assistant(FakeRecorder()):
+        yield
+
+
+def entry(meter_name: str, disabled: bool = False) -> SimpleNamespace:
+    """Config entry of an energy meter."""
+    return SimpleNamespace(
+        data={CONF_METER_NAME: meter_name, CONF_METER_CLASS: "energy"},
+        disabled_by="user" if disabled else None,
+    )
+
+
+def test_loader_preloads_enabled_entries():
+    """Test the stores of the enabled meters are preloaded, once."""
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        water = meter_unique_id("Water", "energy")
+        hass.storage[water] = {"reads": []}
+        loader = MeterStoreLoader(hass)
+        loader.async_preload([entry("Water"), entry("Gas", disabled=True)])
+        preloaded = list(loader._tasks)
+
+        store = create_store(hass, water)
+        data = await loader.async_load(store)
+        # Loaded again, once the preloaded data was handed out
+        reloaded = await loader.async_load(store)
+        return preloaded, store, data, reloaded
+
+    preloaded, store, data, reloaded = asyncio.run(run())
+
+    assert preloaded == [meter_unique_id("Water", "energy")]
+    assert data == {"reads": []}
+    assert reloaded == data
+    assert store.loads == 1
+
+
+def test_loader_loads_entries_not_preloaded():
+    """Test the store of a meter that was not preloaded is loaded directly."""
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        gas = meter_unique_id("Gas", "energy")
+        hass.storage[gas] = {"reads": []}
+        loader = MeterStoreLoader(hass)
+        loader.async_preload([entry("Water")])
+
+        store = create_store(hass, gas)
+        return store, await loader.async_load(store)
+
+    store, data = asyncio.run(run())
+
+    assert data == {"reads": []}
+    assert store.loads == 1
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.utility_manual_tracking import pchip_fitter
+from custom_components.utility_manual_tracking.algorithms import (
+    extrapolate,
+    interpolate,
+    interpolate_history,
+    interpolate_history_chunks,
+    interpolate_lookback,
+    interpolate_series,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint, Series
+from custom_components.utility_manual_tracking.pchip_fitter import end_slope
+
+START = datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)
+
+
+def test_pchip_extrapolate_collinear():
+    """Test PCHIP extrapolation on collinear datapoints."""
+    datapoints = [
+        Datapoint(1, START),
+        Datapoint(2, START + timedelta(hours=1)),
+        Datapoint(3, START + timedelta(hours=2)),
+    ]
+    now = START + timedelta(hours=4)
+
+    extrapolated_datapoint = extrapolate("pchip", datapoints, now)
+
+    assert extrapolated_datapoint.value == pytest.approx(5)
+    assert extrapolated_datapoint.timestamp == now
+
+
+def test_pchip_extrapolate_one_datapoint():
+    """Test PCHIP extrapolation with one datapoint."""
+    now = START + timedelta(hours=4)
+
+    assert extrapolate("pchip", [Datapoint(1, START)], now).value == 1
+    assert extrapolate("pchip", [], now) is None
+
+
+def test_pchip_interpolate_collinear():
+    """Test PCHIP interpolation on collinear datapoints is linear."""
+    old_datapoints = [
+        Datapoint(1, START),
+        Datapoint(2, START + timedelta(hours=1)),
+    ]
+    new_datapoint = Datapoint(5, START + timedelta(hours=4))
+
+    missing_datapoints = interpolate("pchip", old_datapoints, new_datapoint)
+
+    assert [datapoint.value for datapoint in missing_datapoints] == pytest.approx(
+        [3, 4]
+    )
+    assert [datapoint.timestamp for datapoint in missing_datapoints] == [
+        START + timedelta(hours=2),
+        START + timedelta(hours=3),
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_pchip_interpolate_monotone(monkeypatch, vectorized):
+    """Test PCHIP interpolation stays between the datapoints it bridges."""
+    if not vectorized:
+        monkeypatch.setattr(pchip_fitter, "np", None)
+    elif pchip_fitter.np is None:
+        pytest.skip("numpy is not installed")
+
+    old_datapoints = [
+        Datapoint(0, START),
+        Datapoint(100, START + timedelta(hours=1)),
+        Datapoint(101, START + timedelta(hours=2)),
+    ]
+    new_datapoint = Datapoint(110, START + timedelta(hours=50))
+
+    series = interpolate_series("pchip", old_datapoints, new_datapoint)
+
+    assert len(series) == 47
+    values = [101, *series.values, 110]
+    assert all(a <= b for a, b in zip(values, values[1:]))
+
+
+def test_pchip_interpolate_smooth():
+    """Test the hourly increments do not kink at a reading."""
+    datapoints = [
+        Datapoint(hour**2 / 100, START + timedelta(hours=hour))
+        for hour in (0, 10, 20, 30, 40)
+    ]
+
+    series = interpolate_history("pchip", datapoints[:2], datapoints[2:])
+
+    increments = [b - a for a, b in zip(series.values, series.values[1:])]
+    # Around the reading at 30 hours
+    assert increments[19] == pytest.approx(increments[18], rel=0.1)
+    assert increments[19] == pytest.approx(increments[20], rel=0.1)
+
+
+def test_pchip_slopes_cached():
+    """Test the slope at a reading is computed once, for both its segments."""
+    datapoints = [
+        Datapoint(hour**1.5, START + timedelta(days=365) + timedelta(hours=hour))
+        for hour in range(0, 500, 7)
+    ]
+    end_slope.cache_clear()
+
+    interpolate_history("pchip", datapoints[:1], datapoints[1:])
+
+    assert end_slope.cache_info().misses == len(datapoints)
+
+
+def test_pchip_interpolate_history_chunks():
+    """Test the chunks streamed through a history add up to the full series."""
+    old_datapoints = [
+        Datapoint(0, START),
+        Datapoint(100, START + timedelta(hours=1)),
+    ]
+    new_datapoints = [
+        Datapoint(101, START + timedelta(hours=2)),
+        Datapoint(110, START + timedelta(hours=50)),
+    ]
+
+    chunks = list(
+        interpolate_history_chunks("pchip", old_datapoints, new_datapoints, 10)
+    )
+
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert Series.concat(chunks) == interpolate_history(
+        "pchip", old_datapoints, new_datapoints
+    )
+
+
+def test_pchip_interpolate_lookback():
+    """Test the gaps only depend on the lookback latest old datapoints."""
+    old_datapoints = [
+        Datapoint(hour**1.5 + hour % 3, START + timedelta(hours=hour))
+        for hour in range(0, 60, 4)
+    ]
+    new_datapoint = Datapoint(600, START + timedelta(hours=70))
+    lookback = interpolate_lookback(["pchip"])
+
+    assert interpolate_series(
+        "pchip", old_datapoints[-lookback:], new_datapoint
+    ) == interpolate_series("pchip", old_datapoints, new_datapoint)
+    assert interpolate_series(
+        "pchip", old_datapoints[-lookback + 1 :], new_datapoint
+    ) != interpolate_series("pchip", old_datapoints, new_datapoint)
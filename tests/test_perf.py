@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from custom_components.utility_manual_tracking.perf import PerfCounters
+
+
+def test_perf_measure():
+    """Test measuring calls of an operation."""
+    perf = PerfCounters("sensor.test")
+
+    for rows in (3, 4):
+        with perf.measure("backfill_statistics") as counter:
+            counter.rows += rows
+
+    counter = perf.counters["backfill_statistics"]
+    assert counter.calls == 2
+    assert counter.rows == 7
+    assert 0 <= counter.max <= counter.total
+    assert counter.mean == counter.total / 2
+
+
+def test_perf_measure_raises():
+    """Test a call is measured even when it raises."""
+    perf = PerfCounters("sensor.test")
+
+    with pytest.raises(ValueError):
+        with perf.measure("set_value"):
+            raise ValueError
+
+    assert perf.counters["set_value"].calls == 1
+
+
+def test_perf_measure_aiter():
+    """Test measuring a lazy asynchronous iterable as a single call."""
+    perf = PerfCounters("sensor.test")
+
+    async def chunks():
+        yield [1, 2]
+        yield [3]
+
+    async def collect():
+        return [item async for item in perf.measure_aiter("interpolate", chunks())]
+
+    assert asyncio.run(collect()) == [[1, 2], [3]]
+    assert perf.counters["interpolate"].calls == 1
+    assert perf.counters["interpolate"].rows == 3
+
+
+def test_perf_trace(caplog):
+    """Test every call is logged with trace enabled."""
+    perf = PerfCounters("sensor.test", trace=True)
+
+    with caplog.at_level("DEBUG"):
+        with perf.measure("evaluate"):
+            pass
+
+    assert "sensor.test: evaluate took" in caplog.text
+
+
+def test_perf_as_dict():
+    """Test the counters of all operations are serialized."""
+    perf = PerfCounters("sensor.test")
+
+    assert perf.as_dict()["evaluate"] == {
+        "calls": 0,
+        "total": 0.0,
+        "max": 0.0,
+        "rows": 0,
+        "mean": 0.0,
+    }
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.utility_manual_tracking import regression_fitter
+from custom_components.utility_manual_tracking.algorithms import (
+    ALGORITHMS,
+    extrapolate,
+    incremental_fit,
+    interpolate,
+    interpolate_history,
+    interpolate_history_chunks,
+    interpolate_lookback,
+    interpolate_series,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint, Series
+from custom_components.utility_manual_tracking.regression_fitter import (
+    RunningRegression,
+)
+
+START = datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)
+
+
+def test_regression_extrapolate_collinear():
+    """Test regression extrapolation on collinear datapoints."""
+    datapoints = [
+        Datapoint(1, START),
+        Datapoint(2, START + timedelta(hours=1)),
+        Datapoint(3, START + timedelta(hours=2)),
+    ]
+    now = START + timedelta(hours=4)
+
+    extrapolated_datapoint = extrapolate("regression", datapoints, now)
+
+    assert extrapolated_datapoint.value == pytest.approx(5)
+    assert extrapolated_datapoint.timestamp == now
+
+
+def test_regression_extrapolate_smooths_noise():
+    """Test regression extrapolation follows the trend rather than the last reads."""
+    datapoints = [
+        Datapoint(0, START),
+        Datapoint(10, START + timedelta(hours=10)),
+        Datapoint(20, START + timedelta(hours=20)),
+        Datapoint(30, START + timedelta(hours=29)),
+    ]
+
+    model = ALGORITHMS["regression"].extrapolate.fit(datapoints)
+
+    assert 0.9 / 3600 < model.slope < 1.1 / 3600
+
+
+def test_regression_extrapolate_no_datapoints():
+    """Test regression extrapolation with no datapoints."""
+    assert extrapolate("regression", [], START) is None
+
+
+def test_regression_extrapolate_one_datapoint():
+    """Test regression extrapolation with one datapoint."""
+    now = START + timedelta(hours=4)
+
+    extrapolated_datapoint = extrapolate("regression", [Datapoint(1, START)], now)
+
+    assert extrapolated_datapoint.value == 1
+
+
+def test_running_regression_evicts_oldest():
+    """Test the running sums match a fresh fit over the window."""
+    datapoints = [
+        Datapoint(hour**1.5, START + timedelta(hours=hour)) for hour in range(50)
+    ]
+    running = incremental_fit("regression", 5)
+    for datapoint in datapoints:
+        running.add(datapoint)
+
+    fresh = RunningRegression(5)
+    for datapoint in datapoints[-5:]:
+        fresh.add(datapoint)
+
+    running_model = running.model()
+    now = (START + timedelta(hours=60)).timestamp()
+    assert running_model.evaluate(now) == pytest.approx(fresh.model().evaluate(now))
+
+
+def test_regression_interpolate_collinear():
+    """Test regression interpolation on collinear datapoints is linear."""
+    old_datapoints = [
+        Datapoint(1, START),
+        Datapoint(2, START + timedelta(hours=1)),
+    ]
+    new_datapoint = Datapoint(5, START + timedelta(hours=4))
+
+    missing_datapoints = interpolate("regression", old_datapoints, new_datapoint)
+
+    assert [datapoint.value for datapoint in missing_datapoints] == pytest.approx(
+        [3, 4]
+    )
+    assert [datapoint.timestamp for datapoint in missing_datapoints] == [
+        START + timedelta(hours=2),
+        START + timedelta(hours=3),
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_regression_interpolate_monotone(monkeypatch, vectorized):
+    """Test regression interpolation stays between the datapoints it bridges."""
+    if not vectorized:
+        monkeypatch.setattr(regression_fitter, "np", None)
+    elif regression_fitter.np is None:
+        pytest.skip("numpy is not installed")
+
+    old_datapoints = [
+        Datapoint(0, START),
+        Datapoint(100, START + timedelta(hours=1)),
+        Datapoint(101, START + timedelta(hours=2)),
+    ]
+    new_datapoint = Datapoint(110, START + timedelta(hours=50))
+
+    series = interpolate_series("regression", old_datapoints, new_datapoint)
+
+    assert len(series) == 47
+    values = [101, *series.values, 110]
+    assert all(a <= b for a, b in zip(values, values[1:]))
+
+
+def test_regression_interpolate_history_chunks():
+    """Test the chunks streamed through a history add up to the full series."""
+    old_datapoints = [
+        Datapoint(0, START),
+        Datapoint(100, START + timedelta(hours=1)),
+    ]
+    new_datapoints = [
+        Datapoint(101, START + timedelta(hours=2)),
+        Datapoint(110, START + timedelta(hours=50)),
+    ]
+
+    chunks = list(
+        interpolate_history_chunks("regression", old_datapoints, new_datapoints, 10)
+    )
+
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert Series.concat(chunks) == interpolate_history(
+        "regression", old_datapoints, new_datapoints
+    )
+
+
+def test_regression_interpolate_lookback():
+    """Test the gaps only depend on the lookback latest old datapoints."""
+    old_datapoints = [
+        Datapoint(hour**1.5 + hour % 3, START + timedelta(hours=hour))
+        for hour in range(0, 60, 4)
+    ]
+    new_datapoint = Datapoint(600, START + timedelta(hours=70))
+    lookback = interpolate_lookback(["regression"])
+
+    assert interpolate_series(
+        "regression", old_datapoints[-lookback:], new_datapoint
+    ) == interpolate_series("regression", old_datapoints, new_datapoint)
+    assert interpolate_series(
+        "regression", old_datapoints[-lookback + 1 :], new_datapoint
+    ) != interpolate_series("regression", old_datapoints, new_datapoint)
@@ -0,0 +1,444 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import FakeHass, FakeRecorder, create_sensor, fake_home_assistant
+from custom_components.utility_manual_tracking import async_unload_entry
+from custom_components.utility_manual_tracking.algorithms import incremental_fit
+from custom_components.utility_manual_tracking.consts import (
+    CONF_METER_CLASS,
+    CONF_METER_NAME,
+    DOMAIN,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.loader import MeterStoreLoader
+from custom_components.utility_manual_tracking.statistics import get_statistics_id
+
+START = datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+@pytest.fixture
+def recorder():
+    """In-memory recorder and storage for the sensors."""
+    recorder = FakeRecorder()
+    with fake_home_assistant(recorder):
+        yield recorder
+
+
+def statistics(
+    recorder: FakeRecorder, sensor, algorithm: str = "linear"
+) -> dict[float, float]:
+    """Return the hourly statistics of the sensor, by epoch start."""
+    return recorder.statistics[get_statistics_id(sensor.unique_id, algorithm)]
+
+
+def test_sensor_coalesces_same_hour(recorder):
+    """Test readings within the same hour are coalesced, the later one wins."""
+
+    async def run():
+        sensor = create_sensor(FakeHass(asyncio.get_running_loop()))
+        await sensor.async_set_value(0, START)
+        await sensor.async_set_value(10, START + timedelta(hours=5, minutes=10))
+        await sensor.async_set_value(17, START + timedelta(hours=5, minutes=40))
+        return sensor
+
+    sensor = asyncio.run(run())
+
+    assert len(sensor._history) == 2
+    rows = statistics(recorder, sensor)
+    assert rows[(START + 5 * HOUR).timestamp()] == 17
+    # Interpolated towards the coalesced reading
+    assert rows[(START + 2 * HOUR).timestamp()] == pytest.approx(17 * 2 / (5 + 40 / 60))
+
+
+def test_sensor_restores_pending_statistics(recorder):
+    """Test the statistics of the current hour survive a restart."""
+    now = datetime.now(timezone.utc)
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    previous_hour = current_hour - 30 * HOUR
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        sensor = create_sensor(hass)
+        await sensor.async_set_value(0, previous_hour)
+        await sensor.async_set_value(30, now)
+        # The current hour is pending, restart without unloading the sensor
+        sensor._unsub_statistics()
+
+        restored = create_sensor(hass)
+        restored._store = sensor._store
+        await restored._load_attributes()
+        await restored.async_set_value(31, now + HOUR)
+        restored._unsub_statistics()
+        return restored
+
+    restored = asyncio.run(run())
+
+    rows = statistics(recorder, restored)
+    assert all(
+        (previous_hour + hours * HOUR).timestamp() in rows for hours in range(31)
+    )
+    assert rows[current_hour.timestamp()] == 30
+
+
+def test_sensor_commits_queued_readings_in_batches(recorder):
+    """Test concurrent readings are committed in order, as a single batch."""
+    hours = [50, 5, 70, 30, 60, 100, 90, 80]
+
+    async def run(sensor, concurrent):
+        for hour in (0, 20, 40):
+            await sensor.async_set_value(hour, START + hour * HOUR)
+        if concurrent:
+            await asyncio.gather(
+                *(sensor.async_set_value(hour, START + hour * HOUR) for hour in hours)
+            )
+        else:
+            for hour in sorted(hours):
+                await sensor.async_set_value(hour, START + hour * HOUR)
+
+    async def run_both():
+        hass = FakeHass(asyncio.get_running_loop())
+        sensor = create_sensor(hass, "Concurrent")
+        await run(sensor, True)
+        expected = create_sensor(hass, "Sequential")
+        await run(expected, False)
+        return sensor, expected
+
+    sensor, expected = asyncio.run(run_both())
+
+    timestamps = [datapoint.timestamp for datapoint in sensor._history.datapoints()]
+    assert timestamps == sorted(START + hour * HOUR for hour in [0, 20, 40, *hours])
+    # The seeded readings, then a single batch
+    assert sensor.perf.counters["set_value"].calls == 4
+    assert statistics(recorder, sensor) == statistics(recorder, expected)
+
+
+def test_sensor_raises_to_every_caller_of_a_batch(recorder):
+    """Test a failed commit is raised to all the callers of the batch."""
+
+    async def fail(datapoints):
+        raise RuntimeError("Commit failed")
+
+    async def run():
+        sensor = create_sensor(FakeHass(asyncio.get_running_loop()))
+        await sensor.async_set_value(0, START)
+        sensor._async_extend_values = fail
+        results = await asyncio.gather(
+            *(
+                sensor.async_set_value(hour, START + hour * HOUR)
+                for hour in (10, 20, 30)
+            ),
+            return_exceptions=True,
+        )
+        return sensor, results
+
+    sensor, results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert sensor._worker is None
+    assert len(sensor._history) == 1
+
+
+def test_sensor_inserts_late_reading(recorder):
+    """Test a late reading only rewrites the statistics around it."""
+
+    async def run():
+        sensor = create_sensor(FakeHass(asyncio.get_running_loop()))
+        for hour in (0, 10, 20):
+            await sensor.async_set_value(hour * 10, START + hour * HOUR)
+        before = dict(statistics(recorder, sensor))
+        rows_written = recorder.rows_written
+        await sensor.async_set_value(80, START + 5 * HOUR)
+        return sensor, before, recorder.rows_written - rows_written
+
+    sensor, before, rows_written = asyncio.run(run())
+
+    rows = statistics(recorder, sensor)
+    assert rows[(START + 5 * HOUR).timestamp()] == 80
+    assert rows[(START + 2 * HOUR).timestamp()] == pytest.approx(32)
+    assert rows[(START + 7 * HOUR).timestamp()] == pytest.approx(88)
+    assert 0 < rows_written <= 11
+    # The rows from the next reading on are left as they were
+    for hour in range(10, 21):
+        start = (START + hour * HOUR).timestamp()
+        assert rows[start] == before[start]
+    assert len(sensor._history) == 4
+
+
+def test_sensor_exports_chunks(recorder):
+    """Test the readings and the series are exported in aligned chunks."""
+
+    async def run():
+        sensor = create_sensor(
+            FakeHass(asyncio.get_running_loop()), statistics_chunk_size=4
+        )
+        for hour in (0, 10):
+            await sensor.async_set_value(hour * 10, START + hour * HOUR)
+        readings = [chunk async for chunk in sensor.async_export_chunks("readings")]
+        series = [chunk async for chunk in sensor.async_export_chunks("series")]
+        return sensor, readings, series
+
+    sensor, readings, series = asyncio.run(run())
+
+    assert sensor.reading_count == 2
+    assert [chunk["value"].values for chunk in readings] == [[0, 100]]
+    assert [len(chunk["linear"]) for chunk in series] == [4, 4, 3]
+    assert series[-1]["linear"].values[-1] == 100
+
+
+def test_sensor_imports_readings_before_last(recorder):
+    """Test older imported readings are merged into the history, backfilled once."""
+
+    async def run():
+        sensor = create_sensor(
+            FakeHass(asyncio.get_running_loop()),
+            statistics_algorithms=["regression"],
+            retention_reads=50,
+        )
+        await sensor.async_set_value(200, START + 100 * HOUR)
+        backfills = sensor.perf.counters["backfill_statistics"].calls
+        await sensor.async_import_values(
+            [
+                Datapoint(hour * 1.5 + hour % 7, START + hour * HOUR)
+                for hour in range(110, 0, -10)
+            ]
+        )
+        backfills = sensor.perf.counters["backfill_statistics"].calls - backfills
+        rows_written = recorder.rows_written
+        await sensor.async_reset_statistics()
+        return sensor, backfills, recorder.rows_written - rows_written
+
+    sensor, backfills, rows_written = asyncio.run(run())
+
+    timestamps = [datapoint.timestamp for datapoint in sensor._history.datapoints()]
+    assert timestamps == [START + hour * HOUR for hour in range(10, 120, 10)]
+    assert backfills == 1
+    # The statistics are the same as rebuilt through all the readings
+    assert rows_written == 0
+
+
+def test_sensor_inserts_late_reading_as_rebuilt(recorder):
+    """Test a late reading recomputes all the gaps depending on it."""
+
+    async def run():
+        sensor = create_sensor(
+            FakeHass(asyncio.get_running_loop()),
+            algorithm="pchip",
+            statistics_algorithms=["linear", "regression"],
+            # Not downsampled, so that the rebuild goes through the same readings
+            retention_reads=50,
+        )
+        for hour in range(0, 200, 10):
+            await sensor.async_set_value(hour**1.5 + hour % 3, START + hour * HOUR)
+        await sensor.async_set_value(20, START + 5 * HOUR)
+        rows_written = recorder.rows_written
+        await sensor.async_reset_statistics()
+        return sensor, recorder.rows_written - rows_written
+
+    sensor, rows_written = asyncio.run(run())
+
+    assert sensor.statistics_algorithms == ["pchip", "linear", "regression"]
+    # The statistics are the same as rebuilt through all the readings
+    assert rows_written == 0
+
+
+def test_sensor_reset_is_idempotent(recorder):
+    """Test resetting unchanged statistics does not change them."""
+
+    async def run():
+        sensor = create_sensor(FakeHass(asyncio.get_running_loop()))
+        await sensor.async_set_value(0, START)
+        await sensor.async_set_value(55, START + 5.5 * HOUR)
+        rows_written = recorder.rows_written
+        for _ in range(3):
+            await sensor.async_reset_statistics()
+        return sensor, recorder.rows_written - rows_written
+
+    sensor, rows_written = asyncio.run(run())
+
+    assert rows_written == 0
+    assert statistics(recorder, sensor)[(START + 5 * HOUR).timestamp()] == 55
+
+
+def test_sensor_caches_attributes(recorder):
+    """Test the attributes are cached until the history changes."""
+
+    async def run():
+        sensor = create_sensor(FakeHass(asyncio.get_running_loop()))
+        await sensor.async_set_value(0, START)
+        await sensor.async_set_value(10, START + 10 * HOUR)
+        cached = sensor.extra_state_attributes
+        reused = sensor.extra_state_attributes
+
+        await sensor.async_set_value(20, START + 20 * HOUR)
+        appended = sensor.extra_state_attributes
+        await sensor.async_set_value(5, START + 5 * HOUR)
+        inserted = sensor.extra_state_attributes
+        sensor._restore_attributes(sensor._data_to_save())
+        restored = sensor.extra_state_attributes
+        return cached, reused, appended, inserted, restored
+
+    cached, reused, appended, inserted, restored = asyncio.run(run())
+
+    assert reused is cached
+    assert cached["last_read"] == 10
+    assert appended["last_read"] == 20
+    assert len(json.loads(appended["previous_reads"])) == 2
+    assert [read["value"] for read in json.loads(inserted["previous_reads"])] == [
+        0,
+        5,
+        10,
+    ]
+    assert restored is not inserted
+    assert restored == inserted
+
+
+def test_sensor_summary_attributes(recorder):
+    """Test the summary attributes, with the slope per hour."""
+
+    async def run():
+        sensor = create_sensor(
+            FakeHass(asyncio.get_running_loop()), summary_attributes=True
+        )
+        for hour in (0, 10, 20):
+            await sensor.async_set_value(hour * 2, START + hour * HOUR)
+        return sensor.extra_state_attributes
+
+    attributes = asyncio.run(run())
+
+    assert attributes == {
+        "meter_name": "Benchmark",
+        "reads": 3,
+        "first_updated": START,
+        "first_read": 0,
+        "last_updated": START + 20 * HOUR,
+        "last_read": 40,
+        "slope": pytest.approx(2),
+        "algorithm": "linear",
+    }
+
+
+def test_sensor_restores_model(recorder):
+    """Test the saved model is restored, unless fitted over another window."""
+    entry = SimpleNamespace(
+        data={CONF_METER_NAME: "Benchmark", CONF_METER_CLASS: "energy"},
+        disabled_by=None,
+    )
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        sensor = create_sensor(hass, algorithm="regression")
+        for hour, value in ((0, 0), (10, 10), (20, 40)):
+            await sensor.async_set_value(value, START + hour * HOUR)
+        await sensor.async_flush()
+
+        loader = MeterStoreLoader(hass)
+        loader.async_preload([entry])
+        restored = create_sensor(hass, algorithm="regression")
+        await restored._load_attributes(loader)
+        refitted = create_sensor(hass, algorithm="regression", retention_reads=2)
+        await refitted._load_attributes(loader)
+        return sensor, restored, refitted
+
+    sensor, restored, refitted = asyncio.run(run())
+
+    # Preloaded, not loaded by the sensor
+    assert restored._store.loads == 0
+    assert restored.reading_count == 3
+    assert restored._fit is None
+    assert restored._model == sensor._model
+
+    assert refitted._store.loads == 1
+    assert refitted._fit is not None
+    expected = incremental_fit("regression", 2)
+    for datapoint in sensor._history.datapoints(-2):
+        expected.add(datapoint)
+    assert refitted._model == expected.model()
+    assert refitted._model != sensor._model
+
+
+def test_sensor_delays_saves(recorder):
+    """Test the changes within the save delay are saved once."""
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        sensor = create_sensor(hass)
+        for hour in (0, 10, 20):
+            await sensor.async_set_value(hour, START + hour * HOUR)
+        return hass, sensor
+
+    hass, sensor = asyncio.run(run())
+
+    assert sensor._store.saves == 0
+    assert sensor.unique_id not in hass.storage
+    # Written once the delay is over
+    assert len(sensor._store.data["reads"]) == 3
+    assert sensor._store.saves == 1
+    assert sensor.perf.counters["store_save"].calls == 1
+
+
+def test_unload_entry_flushes_sensor(recorder):
+    """Test the pending changes of a meter are saved when it is unloaded."""
+
+    async def unload_platforms(entry, platforms):
+        return True
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        hass.config_entries = SimpleNamespace(async_unload_platforms=unload_platforms)
+        sensor = create_sensor(hass)
+        hass.data[DOMAIN][sensor.entity_id] = sensor
+        for hour in (0, 10):
+            await sensor.async_set_value(hour, START + hour * HOUR)
+        saves = sensor._store.saves
+        unloaded = await async_unload_entry(hass, SimpleNamespace(runtime_data=sensor))
+        return hass, sensor, saves, unloaded
+
+    hass, sensor, saves, unloaded = asyncio.run(run())
+
+    assert unloaded
+    assert saves == 0
+    assert sensor._store.saves == 1
+    assert len(hass.storage[sensor.unique_id]["reads"]) == 2
+    assert sensor.entity_id not in hass.data[DOMAIN]
+
+
+def test_sensor_restores_legacy_format(recorder):
+    """Test the readings stored as a JSON string of previous reads are restored."""
+    previous_reads = [
+        {"value": 0, "timestamp": START.isoformat()},
+        {"value": 10, "timestamp": (START + 10 * HOUR).isoformat()},
+    ]
+
+    async def run():
+        hass = FakeHass(asyncio.get_running_loop())
+        sensor = create_sensor(hass)
+        hass.storage[sensor.unique_id] = {
+            "meter_name": "Benchmark",
+            "last_updated": (START + 20 * HOUR).isoformat(),
+            "last_read": 30,
+            "previous_reads": json.dumps(previous_reads),
+            "algorithm": "linear",
+        }
+        await sensor._load_attributes()
+        restored = sensor._history.datapoints()
+        await sensor.async_set_value(40, START + 30 * HOUR)
+        await sensor.async_flush()
+        return hass, sensor, restored
+
+    hass, sensor, restored = asyncio.run(run())
+
+    assert restored == [
+        Datapoint(0, START),
+        Datapoint(10, START + 10 * HOUR),
+        Datapoint(30, START + 20 * HOUR),
+    ]
+    # Saved in the current format from then on
+    data = hass.storage[sensor.unique_id]
+    assert "previous_reads" not in data
+    assert [read["value"] for read in data["reads"]] == [0, 10, 30, 40]
+    assert statistics(recorder, sensor)[(START + 25 * HOUR).timestamp()] == 35
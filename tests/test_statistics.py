@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.fakes import FakeHass, FakeRecorder, fake_home_assistant
+from custom_components.utility_manual_tracking.algorithms import (
+    interpolate_algorithms_chunks,
+)
+from custom_components.utility_manual_tracking.fitter import Datapoint
+from custom_components.utility_manual_tracking.statistics import (
+    backfill_algorithms_statistics,
+    get_statistics_id,
+)
+
+START = datetime(2023, 10, 1, 0, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+ALGORITHMS = ["linear", "regression"]
+
+
+@pytest.fixture
+def recorder():
+    """In-memory recorder for the statistics."""
+    recorder = FakeRecorder()
+    with fake_home_assistant(recorder):
+        yield recorder
+
+
+def backfill(datapoints: list[Datapoint], size: int = 8) -> int:
+    """Backfill the statistics of the readings, return the rows written."""
+
+    async def chunks():
+        for chunk in interpolate_algorithms_chunks(ALGORITHMS, [], datapoints, size):
+            yield chunk
+
+    async def run():
+        return await backfill_algorithms_statistics(
+            FakeHass(asyncio.get_running_loop()), "sensor", "Meter", "kWh", chunks()
+        )
+
+    return asyncio.run(run())
+
+
+def readings(*values: tuple[float, float]) -> list[Datapoint]:
+    return [Datapoint(value, START + hour * HOUR) for hour, value in values]
+
+
+def test_backfill_replay_writes_nothing(recorder):
+    """Test replaying the same readings does not write any row."""
+    datapoints = readings((0, 0), (10, 100), (20, 150), (30, 300))
+
+    assert backfill(datapoints) == 2 * 31
+    assert recorder.batches_written > 0
+    batches_written = recorder.batches_written
+
+    assert backfill(datapoints) == 0
+    assert recorder.batches_written == batches_written
+
+
+def test_backfill_writes_changed_hours(recorder):
+    """Test changing a late reading only writes the hours it changes."""
+    backfill(readings((0, 0), (10, 100), (20, 150), (30, 300)))
+    linear = dict(recorder.statistics[get_statistics_id("sensor", "linear")])
+
+    assert backfill(readings((0, 0), (10, 100), (20, 200), (30, 300))) > 0
+
+    changed = {
+        start
+        for start, value in recorder.statistics[
+            get_statistics_id("sensor", "linear")
+        ].items()
+        if linear[start] != value
+    }
+    # Only the hours between the neighbours of the changed reading
+    assert changed == {(START + hour * HOUR).timestamp() for hour in range(11, 30)}
+
+
+@pytest.mark.parametrize("size", [8, 6])
+def test_backfill_writes_last_row_of_hour(recorder, size):
+    """Test a reading off the hour wins over the row interpolated before it."""
+    datapoints = readings((0, 0), (5.5, 55))
+    hour = (START + 5 * HOUR).timestamp()
+
+    assert backfill(datapoints, size) == 2 * 6
+    assert recorder.statistics[get_statistics_id("sensor", "linear")][hour] == 55
+
+    # Replaying leaves the hour as it is, also across chunks
+    assert backfill(datapoints, size) == 0
+    assert backfill(datapoints, size) == 0
+    assert recorder.statistics[get_statistics_id("sensor", "linear")][hour] == 55
+
+
+def test_backfill_reads_queued_statistics():
+    """Test the statistics still queued in the recorder are compared with."""
+    recorder = FakeRecorder(queued=True)
+    with fake_home_assistant(recorder):
+        backfill(readings((0, 0), (10, 100)))
+        asyncio.run(recorder.async_block_till_done())
+        backfill(readings((0, 0), (10, 200)))
+        # Back to the readings as recorded, while the correction is queued
+        backfill(readings((0, 0), (10, 100)))
+        asyncio.run(recorder.async_block_till_done())
+
+    rows = recorder.statistics[get_statistics_id("sensor", "linear")]
+    assert rows[(START + 10 * HOUR).timestamp()] == 100
+    assert rows[(START + 5 * HOUR).timestamp()] == 50